@@ -10,6 +10,8 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 from routes import *
 
 # Initialize CSV files and waste archive if they don't exist
-from utils import initialize_csv_files, initialize_waste_archive
+from utils import initialize_csv_files, warm_csv_cache
 initialize_csv_files()
-initialize_waste_archive()
+
+# Parse the main CSV files now rather than on the first request
+warm_csv_cache()
@@ -5,6 +5,7 @@ Since we're using CSV storage, these are simple data classes.
 from dataclasses import dataclass
 from typing import List, Optional
 import csv
+import json
 import os
 
 @dataclass
@@ -23,7 +24,7 @@ class User:
         }
         return permission in permissions.get(self.role, [])
 
-@dataclass
+@dataclass(slots=True)
 class InventoryItem:
     name: str
     unit: str
@@ -62,8 +63,13 @@ class InventoryItem:
             'vendors': self.vendors,
             'last_updated': self.last_updated
         }
+    
+    def to_row(self) -> tuple:
+        """Convert to a tuple in inventory CSV column order"""
+        return (self.name, self.unit, self.quantity, self.par_level,
+                self.category, self.unit_cost, self.vendors, self.last_updated)
 
-@dataclass
+@dataclass(slots=True)
 class WasteEntry:
     item_name: str
     quantity: float
@@ -88,6 +94,11 @@ class WasteEntry:
             'logged_by': self.logged_by,
             'unit_cost': self.unit_cost
         }
+    
+    def to_row(self) -> tuple:
+        """Convert to a tuple in waste log CSV column order"""
+        return (self.item_name, self.quantity, self.unit, self.reason,
+                self.date, self.logged_by, self.unit_cost)
 
 @dataclass
 class WeeklyWasteReport:
@@ -106,9 +117,9 @@ class WeeklyWasteReport:
             'week_end': self.week_end,
             'total_entries': self.total_entries,
             'total_value': self.total_value,
-            'by_category': str(self.by_category),
-            'by_reason': str(self.by_reason),
-            'by_item': str(self.by_item)
+            'by_category': json.dumps(self.by_category, separators=(',', ':')),
+            'by_reason': json.dumps(self.by_reason, separators=(',', ':')),
+            'by_item': json.dumps(self.by_item, separators=(',', ':'))
         }
 
 @dataclass
@@ -129,13 +140,13 @@ class WeeklyInventoryReport:
             'week_end': self.week_end,
             'total_items': self.total_items,
             'total_value': self.total_value,
-            'by_category': str(self.by_category),
-            'by_vendor': str(self.by_vendor),
+            'by_category': json.dumps(self.by_category, separators=(',', ':')),
+            'by_vendor': json.dumps(self.by_vendor, separators=(',', ':')),
             'low_stock_items': self.low_stock_items,
             'generated_date': self.generated_date
         }
 
-@dataclass
+@dataclass(slots=True)
 class Vendor:
     name: str
     contact_info: str = ''
@@ -154,6 +165,11 @@ class Vendor:
             'email': self.email,
             'exclude_from_shopping_list': str(self.exclude_from_shopping_list)
         }
+    
+    def to_row(self) -> tuple:
+        """Convert to a tuple in vendor CSV column order"""
+        return (self.name, self.contact_info, self.address, self.phone,
+                self.email, str(self.exclude_from_shopping_list))
 
 
 
@@ -174,7 +190,7 @@ DEFAULT_CATEGORIES = [
     'Frozen Seafood'
 ]
 
-@dataclass
+@dataclass(slots=True)
 class Category:
     name: str
     description: str = ''
@@ -187,6 +203,10 @@ class Category:
             'description': self.description,
             'created_date': self.created_date
         }
+    
+    def to_row(self) -> tuple:
+        """Convert to a tuple in category CSV column order"""
+        return (self.name, self.description, self.created_date)
 
 # Default vendors
 DEFAULT_VENDORS = [
@@ -1,25 +1,32 @@
 """
 Flask routes for the HPM Inventory application.
 """
-from flask import render_template, request, redirect, url_for, flash, session, make_response, jsonify
+from flask import render_template, request, redirect, url_for, flash, session, make_response, jsonify, g, send_file
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import csv
 import io
+import json
+import re
+import threading
+import uuid
 from app import app
 from models import InventoryItem, WasteEntry, Vendor, Category, DEFAULT_CATEGORIES
 from utils import (
     read_inventory, write_inventory, get_inventory_item, 
+    read_hpm_inventory, read_non_hpm_inventory, get_hpm_item_names,
     update_inventory_item, delete_inventory_item,
     authenticate_user, get_user, read_waste_log, add_waste_entry, 
     write_waste_log, update_waste_entry, delete_waste_entry, get_waste_entry,
-    get_low_stock_items, export_inventory_csv, import_inventory_csv,
-    read_vendors, write_vendors, get_vendor, add_vendor, update_vendor, delete_vendor, is_vendor_in_use,
+    get_low_stock_items, sum_stock_value, sum_waste_value, export_inventory_csv_bytes, import_inventory_csv,
+    read_vendors, get_vendor, add_vendor, update_vendor, delete_vendor, is_vendor_in_use,
     filter_inventory, get_shopping_list_items,
-    generate_shopping_list_pdf,
-    read_categories, write_categories, get_category, add_category,
+    write_shopping_list_pdf,
+    read_categories, get_category, add_category,
     update_category, delete_category, get_category_names, is_category_in_use,
-    check_and_archive_if_needed, read_weekly_reports, get_week_comparison, 
-    initialize_waste_archive
+    compute_vendor_and_category_usage,
+    check_and_archive_if_needed, should_archive_waste_log, summarize_non_hpm_waste, read_weekly_reports, get_week_comparison, 
+    initialize_waste_archive, get_data_version, format_timestamp, INVENTORY_FILE, VENDORS_FILE
 )
 
 def require_login(f):
@@ -50,6 +57,92 @@ def require_permission(permission):
         return decorated_function
     return decorator
 
+def not_modified_response(etag, revalidate=False):
+    """Return a 304 response if the client already holds the given ETag"""
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        set_cache_headers(response, etag, revalidate)
+        return response
+    return None
+
+def set_cache_headers(response, etag, revalidate=False):
+    """Attach the ETag and a short private cache lifetime to a download response"""
+    response.set_etag(etag)
+    response.cache_control.private = True
+    if revalidate:
+        # Data that must be current on every load: keep it, but check the ETag each time
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = 30
+    return response
+
+# Pages whose output only varies with the session, reused for visitors without one
+_anonymous_page_cache = {}
+
+def render_anonymous_cached(template, **context):
+    """Render a template, reusing the rendered HTML when the session is empty"""
+    if session or app.debug:
+        return render_template(template, **context)
+    key = (template, tuple(sorted(context.items())))
+    html = _anonymous_page_cache.get(key)
+    if html is None:
+        html = render_template(template, **context)
+        _anonymous_page_cache[key] = html
+    return html
+
+# Admin maintenance jobs run one at a time, off the request thread
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hpm-job')
+_jobs = {}
+_MAX_TRACKED_JOBS = 50
+# Guards _jobs and _archive_job_id, which request threads read and change concurrently
+_jobs_lock = threading.RLock()
+
+def submit_job(func, *args):
+    """Run func in the background and return a job id for /job_status"""
+    def run():
+        try:
+            return func(*args)
+        except Exception:
+            app.logger.exception('Background job %s failed', func.__name__)
+            raise
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        # Forget the oldest finished jobs so the registry stays small
+        while len(_jobs) >= _MAX_TRACKED_JOBS:
+            oldest = next(iter(_jobs))
+            if not _jobs[oldest].done():
+                break
+            del _jobs[oldest]
+        _jobs[job_id] = _job_executor.submit(run)
+    return job_id
+
+def get_job(job_id: str):
+    """Future of a tracked background job, or None when it is unknown or forgotten"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+# Job archiving the waste log after should_archive_waste_log() said it was due
+_archive_job_id = None
+
+def start_waste_archive_if_needed() -> bool:
+    """Queue a waste log archive job when one is due and none is pending"""
+    global _archive_job_id
+    with _jobs_lock:
+        pending = _jobs.get(_archive_job_id)
+        if pending is not None and not pending.done():
+            return False
+        if not should_archive_waste_log():
+            return False
+        _archive_job_id = submit_job(check_and_archive_if_needed)
+    return True
+
+def request_timestamp() -> str:
+    """Timestamp shared by every write in the current request, formatted on first use"""
+    now_str = g.get('now_str')
+    if now_str is None:
+        now_str = g.now_str = format_timestamp(datetime.now())
+    return now_str
+
 @app.route('/')
 def index():
     """Redirect to inventory page"""
@@ -71,7 +164,7 @@ def login():
         else:
             flash('Invalid username or password.', 'danger')
     
-    return render_template('login.html')
+    return render_anonymous_cached('login.html')
 
 @app.route('/logout')
 def logout():
@@ -91,20 +184,19 @@ def inventory():
     
     # Apply filters
     items = filter_inventory(category=category_filter, vendor=vendor_filter, low_stock_only=low_stock_filter)
-    all_items = read_inventory()  # For totals
-    low_stock_items = get_low_stock_items()
     user = get_user(session['username'])
     
     # Exclude HPM items from main inventory calculations
-    non_hpm_items = [item for item in all_items if 'HPM' not in item.get_vendors()]
-    non_hpm_low_stock = [item for item in low_stock_items if 'HPM' not in item.get_vendors()]
+    non_hpm_items = read_non_hpm_inventory()  # For totals
+    non_hpm_low_stock = get_low_stock_items()
     
     # Filter displayed items to exclude HPM items unless specifically filtering for HPM vendor
     if vendor_filter != 'HPM':
-        items = [item for item in items if 'HPM' not in item.get_vendors()]
+        hpm_names = get_hpm_item_names()
+        items = [item for item in items if item.name not in hpm_names]
     
     # Calculate total inventory value (excluding HPM items)
-    total_value = sum(item.total_value() for item in non_hpm_items)
+    total_value = sum_stock_value(non_hpm_items)
     
     # Get vendors and categories for filter dropdowns
     vendors = read_vendors()
@@ -149,7 +241,7 @@ def add_item():
             category=category,
             unit_cost=unit_cost,
             vendors=vendors,
-            last_updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            last_updated=request_timestamp()
         )
         
         # Add to inventory
@@ -195,7 +287,7 @@ def edit_item(item_name):
         item.category = request.form.get('category', 'General').strip()
         item.unit_cost = float(request.form.get('unit_cost', 0.0))
         item.vendors = request.form.get('vendors', '').strip()
-        item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        item.last_updated = request_timestamp()
         
         # If name changed, delete old item and create new one
         if new_name != item_name:
@@ -248,7 +340,7 @@ def update_count(item_name):
     
     new_count = float(request.form['count'])
     item.quantity = new_count
-    item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    item.last_updated = request_timestamp()
     
     if update_inventory_item(item_name, item):
         flash(f'Count updated for "{item_name}".', 'success')
@@ -261,10 +353,10 @@ def update_count(item_name):
 @require_login
 def waste_log():
     """Waste logging page with full CRUD operations"""
-    # Check if we need to archive old waste data
+    # Check if we need to archive old waste data; the archiving itself runs in the background
     try:
-        if check_and_archive_if_needed():
-            flash('Waste log archived automatically (7+ days old data moved to archive).', 'info')
+        if start_waste_archive_if_needed():
+            flash('Waste log is being archived automatically (7+ days old data moved to archive).', 'info')
     except Exception:
         # If archival check fails, continue without archiving
         pass
@@ -288,7 +380,7 @@ def waste_log():
                     quantity=quantity,
                     unit=unit,
                     reason=reason,
-                    date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    date=request_timestamp(),
                     logged_by=session['username'],
                     unit_cost=unit_cost
                 )
@@ -299,7 +391,7 @@ def waste_log():
                 # Update inventory if item exists
                 if item:
                     item.quantity = max(0, item.quantity - quantity)
-                    item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    item.last_updated = request_timestamp()
                     update_inventory_item(item_name, item)
                 
                 flash(f'Waste logged for "{item_name}".', 'success')
@@ -333,7 +425,7 @@ def waste_log():
                     quantity=quantity,
                     unit=unit,
                     reason=reason,
-                    date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    date=request_timestamp(),
                     logged_by=session['username'],
                     unit_cost=unit_cost
                 )
@@ -343,7 +435,7 @@ def waste_log():
                     # Update inventory with new waste
                     if item:
                         item.quantity = max(0, item.quantity - quantity)
-                        item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        item.last_updated = request_timestamp()
                         update_inventory_item(item_name, item)
                     
                     flash(f'Waste entry updated successfully.', 'success')
@@ -363,7 +455,7 @@ def waste_log():
                     item = get_inventory_item(entry.item_name)
                     if item:
                         item.quantity += entry.quantity
-                        item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        item.last_updated = request_timestamp()
                         update_inventory_item(entry.item_name, item)
                     
                     # Delete entry
@@ -380,26 +472,37 @@ def waste_log():
     
     # Get waste log entries and inventory items
     waste_entries = read_waste_log()
-    inventory_items = read_inventory()
     user = get_user(session['username'])
     
     # Exclude HPM items from main waste calculations
-    non_hpm_inventory = [item for item in inventory_items if 'HPM' not in item.get_vendors()]
-    non_hpm_waste_entries = [entry for entry in waste_entries if any(item.name == entry.item_name and 'HPM' not in item.get_vendors() for item in inventory_items)]
-    
-    # Convert non-HPM inventory items to dict format for JavaScript
-    inventory_data = [item.to_dict() for item in non_hpm_inventory]
+    non_hpm_inventory = read_non_hpm_inventory()
+    non_hpm_names = {item.name for item in non_hpm_inventory}
+    non_hpm_waste_entries = [entry for entry in waste_entries if entry.item_name in non_hpm_names]
     
     # Calculate total waste value (excluding HPM items)
-    total_waste_value = sum(entry.waste_value() for entry in non_hpm_waste_entries)
+    total_waste_value = sum_waste_value(non_hpm_waste_entries)
     
     return render_template('waste_log.html', 
                          waste_entries=non_hpm_waste_entries, 
                          inventory_items=non_hpm_inventory,
-                         inventory_data=inventory_data,
                          total_waste_value=total_waste_value,
                          user=user)
 
+@app.route('/api/inventory.json')
+@require_login
+def api_inventory():
+    """Non-HPM inventory items as JSON for client-side lookups"""
+    # Autofill must see items added a moment ago, so browsers revalidate on every load
+    etag = get_data_version(INVENTORY_FILE)
+    not_modified = not_modified_response(etag, revalidate=True)
+    if not_modified:
+        return not_modified
+    
+    items = [item.to_dict() for item in read_non_hpm_inventory()]
+    response = jsonify(items)
+    set_cache_headers(response, etag, revalidate=True)
+    return response
+
 @app.route('/import_export', methods=['GET', 'POST'])
 @require_permission('import')
 def import_export():
@@ -409,8 +512,9 @@ def import_export():
             file = request.files['import_file']
             if file.filename != '':
                 try:
-                    csv_data = file.read().decode('utf-8')
-                    success, message = import_inventory_csv(csv_data)
+                    # Decode the upload lazily instead of buffering it as one string
+                    csv_stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+                    success, message = import_inventory_csv(csv_stream)
                     if success:
                         flash(message, 'success')
                     else:
@@ -427,24 +531,32 @@ def import_export():
 @require_permission('export')
 def export_csv():
     """Export inventory as CSV file"""
-    csv_data = export_inventory_csv()
+    # Skip regeneration when the client already has this version of the inventory
+    etag = get_data_version(INVENTORY_FILE)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+    
+    # Encoded once per inventory version rather than on every download
+    csv_data = export_inventory_csv_bytes()
     
     # Create response with CSV data
     response = make_response(csv_data)
     response.headers['Content-Type'] = 'text/csv'
     response.headers['Content-Disposition'] = f'attachment; filename=hpm_inventory_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    set_cache_headers(response, etag)
     
     return response
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return render_template('layout.html', error_message="Page not found"), 404
+    return render_anonymous_cached('layout.html', error_message="Page not found"), 404
 
 @app.errorhandler(500)
 def server_error(error):
     """Handle 500 errors"""
-    return render_template('layout.html', error_message="Internal server error"), 500
+    return render_anonymous_cached('layout.html', error_message="Internal server error"), 500
 
 # Vendor Management Routes
 @app.route('/vendors', methods=['GET', 'POST'])
@@ -528,10 +640,9 @@ def vendors():
     # Get all vendors
     vendors = read_vendors()
     
-    # Get usage information for each vendor
-    vendor_usage = {}
-    for vendor in vendors:
-        vendor_usage[vendor.name] = is_vendor_in_use(vendor.name)
+    # Get usage information for each vendor from a single inventory scan
+    used_vendors, _ = compute_vendor_and_category_usage()
+    vendor_usage = {vendor.name: vendor.name in used_vendors for vendor in vendors}
     
     return render_template('vendors.html', vendors=vendors, vendor_usage=vendor_usage)
 
@@ -583,15 +694,11 @@ def edit_vendor(vendor_name):
         vendor.phone = request.form.get('phone', '').strip()
         vendor.email = request.form.get('email', '').strip()
         
-        # Update vendor
-        vendors = read_vendors()
-        for i, v in enumerate(vendors):
-            if v.name == vendor_name:
-                vendors[i] = vendor
-                break
-        
-        write_vendors(vendors)
-        flash(f'Vendor "{vendor_name}" updated successfully.', 'success')
+        # Update vendor in place via the cached name index
+        if update_vendor(vendor_name, vendor):
+            flash(f'Vendor "{vendor_name}" updated successfully.', 'success')
+        else:
+            flash(f'Error updating vendor "{vendor_name}".', 'danger')
         return redirect(url_for('vendors'))
     
     return render_template('edit_vendor.html', vendor=vendor)
@@ -616,7 +723,7 @@ def categories():
             new_category = Category(
                 name=name,
                 description=description,
-                created_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                created_date=request_timestamp()
             )
             
             if add_category(new_category):
@@ -636,7 +743,7 @@ def categories():
             updated_category = Category(
                 name=new_name,
                 description=new_description,
-                created_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                created_date=request_timestamp()
             )
             
             if update_category(old_name, updated_category):
@@ -665,10 +772,9 @@ def categories():
     # Get all categories
     categories = read_categories()
     
-    # Get usage information for each category
-    category_usage = {}
-    for category in categories:
-        category_usage[category.name] = is_category_in_use(category.name)
+    # Get usage information for each category from a single inventory scan
+    _, used_categories = compute_vendor_and_category_usage()
+    category_usage = {category.name: category.name in used_categories for category in categories}
     
     return render_template('categories.html', categories=categories, category_usage=category_usage)
 
@@ -678,11 +784,27 @@ def categories():
 def generate_shopping_list_pdf_route():
     """Generate shopping list PDF"""
     try:
-        pdf_bytes = generate_shopping_list_pdf()
-        
-        response = make_response(pdf_bytes)
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename="shopping_list_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf"'
+        # The shopping list depends on inventory levels and vendor exclusions
+        etag = get_data_version(INVENTORY_FILE, VENDORS_FILE)
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+        
+        # Send the rendered buffer itself rather than a bytes copy of it
+        buffer = io.BytesIO()
+        write_shopping_list_pdf(buffer)
+        buffer.seek(0)
+        
+        response = send_file(
+            buffer,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f'shopping_list_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf',
+            etag=False
+        )
+        # send_file marks responses without a max_age as no-cache; use our usual caching instead
+        response.cache_control.no_cache = None
+        set_cache_headers(response, etag)
         return response
     except Exception as e:
         flash(f'Error generating shopping list PDF: {str(e)}', 'danger')
@@ -704,7 +826,7 @@ def weekly_waste_reports():
     weekly_reports = read_weekly_reports()
     
     # Get week-to-week comparison
-    current_week, previous_week = get_week_comparison()
+    current_week, previous_week = get_week_comparison(reports=weekly_reports)
     
     # Calculate comparison data
     comparison_data = None
@@ -722,7 +844,7 @@ def weekly_waste_reports():
     inventory_reports = read_weekly_inventory_reports()
     
     # Get inventory week-to-week comparison
-    current_inventory_week, previous_inventory_week = get_inventory_week_comparison()
+    current_inventory_week, previous_inventory_week = get_inventory_week_comparison(reports=inventory_reports)
     
     # Calculate inventory comparison data
     inventory_comparison_data = None
@@ -736,43 +858,16 @@ def weekly_waste_reports():
             'items_change_percent': ((current_inventory_week.total_items - previous_inventory_week.total_items) / previous_inventory_week.total_items * 100) if previous_inventory_week.total_items > 0 else 0
         }
     
-    # Get current week data (if any) - exclude HPM items
-    all_waste_entries = read_waste_log()
-    all_inventory_items = read_inventory()
-    current_waste_entries = [entry for entry in all_waste_entries if any(item.name == entry.item_name and 'HPM' not in item.get_vendors() for item in all_inventory_items)]
-    
-    current_week_data = None
-    if current_waste_entries:
-        # Calculate current week totals
-        total_value = sum(entry.waste_value() for entry in current_waste_entries)
-        total_entries = len(current_waste_entries)
-        
-        # Group by category
-        by_category = {}
-        inventory_items = {item.name: item for item in all_inventory_items if 'HPM' not in item.get_vendors()}
-        for entry in current_waste_entries:
-            item = inventory_items.get(entry.item_name)
-            category = item.category if item else 'Unknown'
-            by_category[category] = by_category.get(category, 0) + entry.waste_value()
-        
-        # Group by reason
-        by_reason = {}
-        for entry in current_waste_entries:
-            by_reason[entry.reason] = by_reason.get(entry.reason, 0) + entry.waste_value()
-        
-        current_week_data = {
-            'total_value': total_value,
-            'total_entries': total_entries,
-            'by_category': by_category,
-            'by_reason': by_reason
-        }
+    # Get current week data (if any) - exclude HPM items; computed once per version of the data
+    current_week_data = summarize_non_hpm_waste()
     
     return render_template('weekly_waste_reports.html', 
                          weekly_reports=weekly_reports, 
                          comparison_data=comparison_data,
                          current_week_data=current_week_data,
                          inventory_reports=inventory_reports,
-                         inventory_comparison_data=inventory_comparison_data)
+                         inventory_comparison_data=inventory_comparison_data,
+                         job_id=request.args.get('job'))
 
 @app.route('/force_archive', methods=['POST'])
 @require_permission('edit')
@@ -784,26 +879,47 @@ def force_archive():
     if not entries:
         flash('No waste entries to archive.', 'warning')
     else:
-        archive_waste_log()
-        flash('Waste log archived successfully.', 'success')
+        job_id = submit_job(archive_waste_log)
+        flash('Waste log archiving started. The page will refresh when the new weekly report is ready.', 'success')
+        # The reports page polls /job_status for this job and shows it if it fails
+        return redirect(url_for('weekly_waste_reports', job=job_id))
     
     return redirect(url_for('weekly_waste_reports'))
 
+def _generate_and_save_inventory_report():
+    """Build this week's inventory report and append it to the reports file"""
+    from utils import generate_weekly_inventory_report, save_weekly_inventory_report
+    save_weekly_inventory_report(generate_weekly_inventory_report())
+
 @app.route('/force_generate_inventory_report', methods=['POST'])
 @require_permission('edit')
 def force_generate_inventory_report():
     """Force generate weekly inventory report (for admin users)"""
-    try:
-        from utils import generate_weekly_inventory_report, save_weekly_inventory_report
-        report = generate_weekly_inventory_report()
-        save_weekly_inventory_report(report)
-        flash('Weekly inventory report generated successfully!', 'success')
-    except Exception as e:
-        flash(f'Error generating inventory report: {str(e)}', 'danger')
+    job_id = submit_job(_generate_and_save_inventory_report)
+    flash('Weekly inventory report generation started. The page will refresh when it is ready.', 'success')
     
-    return redirect(url_for('weekly_waste_reports'))
+    return redirect(url_for('weekly_waste_reports', job=job_id))
+
+@app.route('/job_status/<job_id>')
+@require_permission('edit')
+def job_status(job_id):
+    """Report whether a background admin job is still running"""
+    future = get_job(job_id)
+    if future is None:
+        return jsonify({'status': 'unknown'}), 404
+    if not future.done():
+        return jsonify({'status': 'running'})
+    error = future.exception()
+    if error is not None:
+        return jsonify({'status': 'failed', 'error': str(error)})
+    return jsonify({'status': 'done'})
 
 # HPM Items Management Routes
+
+# Categories whose names contain any of these words are offered on the HPM page
+HPM_CATEGORY_KEYWORDS = ['HPM', 'Frozen', 'Chef', 'Healthy', 'Meal', 'Choice', 'Beef', 'Chicken', 'Turkey', 'Seafood']
+_HPM_CATEGORY_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in HPM_CATEGORY_KEYWORDS), re.IGNORECASE)
+
 @app.route('/hpm_items', methods=['GET', 'POST'])
 @require_login
 def hpm_items():
@@ -819,7 +935,7 @@ def hpm_items():
                 item = get_inventory_item(item_name)
                 if item and 'HPM' in item.get_vendors():
                     item.quantity = new_count
-                    item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    item.last_updated = request_timestamp()
                     update_inventory_item(item_name, item)
                     flash(f'Updated count for "{item_name}" to {new_count}.', 'success')
                 else:
@@ -849,7 +965,7 @@ def hpm_items():
                     quantity=quantity,
                     unit=unit,
                     reason=reason,
-                    date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    date=request_timestamp(),
                     logged_by=session['username'],
                     unit_cost=unit_cost
                 )
@@ -859,7 +975,7 @@ def hpm_items():
                 
                 # Update inventory
                 item.quantity = max(0, item.quantity - quantity)
-                item.last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                item.last_updated = request_timestamp()
                 update_inventory_item(item_name, item)
                 
                 flash(f'Waste logged for "{item_name}".', 'success')
@@ -874,8 +990,8 @@ def hpm_items():
     low_stock_filter = request.args.get('low_stock', '').lower() == 'true'
     
     # Get all inventory items and filter for HPM vendor
-    all_items = read_inventory()
-    hpm_items = [item for item in all_items if 'HPM' in item.get_vendors()]
+    all_hpm_items = read_hpm_inventory()
+    hpm_items = all_hpm_items
     
     # Apply filters
     if category_filter:
@@ -886,27 +1002,27 @@ def hpm_items():
     
     # Get HPM waste log entries
     all_waste_entries = read_waste_log()
-    hpm_waste_entries = [entry for entry in all_waste_entries if any(item.name == entry.item_name and 'HPM' in item.get_vendors() for item in all_items)]
+    all_hpm_names = get_hpm_item_names()
+    hpm_waste_entries = [entry for entry in all_waste_entries if entry.item_name in all_hpm_names]
     
     # Calculate stats based on filtered items (not all HPM items)
-    filtered_low_stock = [item for item in hpm_items if item.is_low_stock()]
+    filtered_low_stock = hpm_items if low_stock_filter else [item for item in hpm_items if item.is_low_stock()]
     
     # Get waste entries for filtered items only
-    filtered_waste_entries = [entry for entry in hpm_waste_entries if any(item.name == entry.item_name for item in hpm_items)]
+    filtered_names = {item.name for item in hpm_items}
+    filtered_waste_entries = [entry for entry in hpm_waste_entries if entry.item_name in filtered_names]
     
     # Calculate totals based on filtered items
     total_items = len(hpm_items)
-    total_value = sum(item.total_value() for item in hpm_items)
-    total_waste_value = sum(entry.waste_value() for entry in filtered_waste_entries)
+    total_value = sum_stock_value(hpm_items)
+    total_waste_value = sum_waste_value(filtered_waste_entries)
     low_stock_count = len(filtered_low_stock)
     
     # Get categories for filter dropdown - include HPM-relevant categories
-    all_hpm_items = [item for item in all_items if 'HPM' in item.get_vendors()]
-    used_categories = set(item.category for item in all_hpm_items)
+    used_categories = {item.category for item in all_hpm_items}
     
     # Also include categories that are specifically HPM-related (contain "HPM", "Frozen", "Chef", etc.)
     all_categories = get_category_names()
-    hpm_related_keywords = ['HPM', 'Frozen', 'Chef', 'Healthy', 'Meal', 'Choice', 'Beef', 'Chicken', 'Turkey', 'Seafood']
     hpm_relevant_categories = set()
     
     for category in all_categories:
@@ -914,10 +1030,10 @@ def hpm_items():
         if category in used_categories:
             hpm_relevant_categories.add(category)
         # Include if contains HPM-related keywords (case insensitive)
-        elif any(keyword.lower() in category.lower() for keyword in hpm_related_keywords):
+        elif _HPM_CATEGORY_PATTERN.search(category):
             hpm_relevant_categories.add(category)
     
-    categories = sorted(list(hpm_relevant_categories))
+    categories = sorted(hpm_relevant_categories)
     
     user = get_user(session['username'])
     
@@ -966,7 +1082,6 @@ def archive_hpm_waste():
 def hpm_reports():
     """View HPM weekly reports with week-to-week comparison"""
     from utils import read_hpm_reports
-    import json
     
     reports = read_hpm_reports()
     
@@ -1007,8 +1122,7 @@ def add_category_route():
             return jsonify({'success': False, 'error': 'Category name is required'})
         
         # Check if category already exists
-        existing_categories = get_category_names()
-        if category_name in existing_categories:
+        if get_category(category_name) is not None:
             return jsonify({'success': False, 'error': 'Category already exists'})
         
         # Add new category
@@ -1016,7 +1130,7 @@ def add_category_route():
         new_category = Category(
             name=category_name,
             description=f'Custom {category_name} category',
-            created_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            created_date=request_timestamp()
         )
         
         add_category(new_category)
@@ -1085,7 +1199,7 @@ def add_inventory_item():
             category=category,
             unit_cost=unit_cost,
             vendors=vendors,
-            last_updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            last_updated=request_timestamp()
         )
         
         # Add to inventory
@@ -1103,9 +1217,10 @@ def add_inventory_item():
         flash(f'Error adding item: {str(e)}', 'danger')
         return redirect(request.referrer or url_for('inventory'))
 
-@app.route('/delete_inventory_item', methods=['POST'])
+# Named apart from utils.delete_inventory_item, which this module-level name used to shadow
+@app.route('/delete_inventory_item', methods=['POST'], endpoint='delete_inventory_item')
 @require_permission('delete')
-def delete_inventory_item():
+def delete_inventory_item_api():
     """Delete an inventory item"""
     try:
         data = request.get_json()
@@ -1114,19 +1229,10 @@ def delete_inventory_item():
         if not item_name:
             return jsonify({'success': False, 'error': 'Item name is required'})
         
-        # Read current inventory
-        items = read_inventory()
-        
-        # Find and remove the item
-        original_count = len(items)
-        items = [item for item in items if item.name != item_name]
-        
-        if len(items) == original_count:
+        # Find and remove the item via the cached name index
+        if not delete_inventory_item(item_name):
             return jsonify({'success': False, 'error': f'Item "{item_name}" not found'})
         
-        # Write updated inventory
-        write_inventory(items)
-        
         return jsonify({'success': True, 'message': f'Item "{item_name}" deleted successfully'})
         
     except Exception as e:
@@ -1147,18 +1253,13 @@ def add_category_api():
         if not category_name:
             return jsonify({'success': False, 'message': 'Category name is required'})
         
-        # Read current categories
-        categories = read_categories()
-        
         # Check if category already exists
-        if category_name in [cat.name for cat in categories]:
+        if get_category(category_name) is not None:
             return jsonify({'success': False, 'message': f'Category "{category_name}" already exists'})
         
         # Add new category
-        from models import Category
-        new_category = Category(category_name)
-        categories.append(new_category)
-        write_categories(categories)
+        if not add_category(Category(category_name)):
+            return jsonify({'success': False, 'message': f'Error adding category "{category_name}"'})
         
         return jsonify({'success': True, 'message': f'Category "{category_name}" added successfully'})
         
@@ -1187,18 +1288,11 @@ def delete_category_api():
         if is_category_in_use(category_name):
             return jsonify({'success': False, 'message': f'Cannot delete category "{category_name}" because it is being used by inventory items'})
         
-        # Read current categories
-        categories = read_categories()
-        
-        # Find and remove the category
-        original_count = len(categories)
-        categories = [cat for cat in categories if cat.name != category_name]
-        
-        if len(categories) == original_count:
+        # Find and remove the category via the cached name index
+        if get_category(category_name) is None:
             return jsonify({'success': False, 'message': f'Category "{category_name}" not found'})
-        
-        # Write updated categories
-        write_categories(categories)
+        if not delete_category(category_name):
+            return jsonify({'success': False, 'message': f'Error deleting category "{category_name}"'})
         
         return jsonify({'success': True, 'message': f'Category "{category_name}" deleted successfully'})
         
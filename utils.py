@@ -1,13 +1,26 @@
 """
 Utility functions for CSV operations and data management.
 """
+import ast
+import copy
 import csv
+import glob
+import hashlib
+import heapq
+import io
+import json
+import logging
+import operator
 import os
+import re
 import shutil
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Iterable
 from werkzeug.security import generate_password_hash, check_password_hash
-from models import User, InventoryItem, WasteEntry, Vendor, Category, WeeklyWasteReport, WeeklyInventoryReport, DEFAULT_VENDORS, DEFAULT_CATEGORIES
+from models import User, InventoryItem, WasteEntry, Vendor, Category, WeeklyWasteReport, WeeklyInventoryReport, HPMWeeklyReport, DEFAULT_VENDORS, DEFAULT_CATEGORIES
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -15,6 +28,8 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib import colors
 from io import BytesIO
 
+logger = logging.getLogger(__name__)
+
 # File paths
 INVENTORY_FILE = 'inventory.csv'
 USERS_FILE = 'users.csv'
@@ -25,37 +40,156 @@ WASTE_ARCHIVE_DIR = 'waste_archive'
 WEEKLY_REPORTS_FILE = 'weekly_waste_reports.csv'
 WEEKLY_INVENTORY_REPORTS_FILE = 'weekly_inventory_reports.csv'
 
+# Timestamp format used for every date column in the CSV files
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def format_timestamp(value: datetime) -> str:
+    """Format a datetime as DATETIME_FORMAT without parsing the format string each time"""
+    return value.isoformat(' ', 'seconds')
+
+# Leading digits and dots of a waste log unit_cost cell
+_UNIT_COST_RE = re.compile(r'^[\d.]+')
+
+# A zero-padded DATETIME_FORMAT timestamp, whose string order is its chronological order
+_PADDED_DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
+# Buffer size for full-file CSV rewrites, so large files go out in few write() calls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Largest buffer for full-file CSV reads, so large files come in with few read() calls
+READ_BUFFER_SIZE = 1 << 20
+
+def _read_buffer_size(file_size: int) -> int:
+    """Read buffer for a file of this size: all of it in one read() up to READ_BUFFER_SIZE"""
+    # One byte over the size, so the end of file shows up in the same read
+    return min(max(file_size + 1, io.DEFAULT_BUFFER_SIZE), READ_BUFFER_SIZE)
+
+# Inventory CSV columns, in the order InventoryItem.to_row() produces them
+INVENTORY_FIELDS = ['name', 'unit', 'quantity', 'par_level', 'category', 'unit_cost', 'vendors', 'last_updated']
+
+# Waste log CSV columns, in the order WasteEntry.to_row() produces them
+WASTE_LOG_FIELDS = ['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost']
+
+# Vendor and category CSV columns, in the order their to_row() produces them
+VENDOR_FIELDS = ['name', 'contact_info', 'address', 'phone', 'email', 'exclude_from_shopping_list']
+CATEGORY_FIELDS = ['name', 'description', 'created_date']
+
+def get_data_version(*paths: str) -> str:
+    """Build a version tag for the given data files from their mtime and size"""
+    parts = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_mtime_ns:x}.{st.st_size:x}")
+        except FileNotFoundError:
+            parts.append('0')
+    return '-'.join(parts)
+
+# Parsed CSV contents keyed by path: ((mtime_ns, size), rows, derived lookups)
+_csv_cache = {}
+# Held while parsing so concurrent requests that miss the cache parse a file only once
+_csv_cache_lock = threading.RLock()
+
+def _load_csv_cached(path: str, parse_rows) -> list:
+    """Parse a CSV file once and reuse the rows until its mtime or size changes"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _csv_cache.pop(path, None)
+        raise
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _csv_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _csv_cache_lock:
+        # Another thread may have parsed this version while we waited
+        cached = _csv_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(path, 'r', newline='', buffering=_read_buffer_size(st.st_size)) as file:
+            rows = parse_rows(csv.reader(file))
+        _csv_cache[path] = (stamp, rows, {})
+    return rows
+
+def _parse_csv_file(path: str, parse_rows) -> list:
+    """Parse a CSV file without caching it, for files read too rarely to keep in memory"""
+    with open(path, 'r', newline='', buffering=_read_buffer_size(os.path.getsize(path))) as file:
+        return parse_rows(csv.reader(file))
+
+def _cached_lookup(path: str, load_rows, name: str, build):
+    """Memoize a value derived from a cached CSV alongside its parsed rows"""
+    rows = load_rows()
+    cached = _csv_cache.get(path)
+    if cached is None or cached[1] is not rows:
+        return build(rows)
+    derived = cached[2]
+    if name not in derived:
+        derived[name] = build(rows)
+    return derived[name]
+
+def _header_columns(reader) -> Optional[Dict[str, int]]:
+    """Map column names to positions from a csv.reader's header row"""
+    header = next(reader, None)
+    if header is None:
+        return None
+    return {name: i for i, name in enumerate(header)}
+
+def _invalidate_csv_cache(path: str):
+    """Drop the cached parse of a CSV file after writing it"""
+    _csv_cache.pop(path, None)
+
+def warm_csv_cache():
+    """Parse the hot CSV files up front so the first request is served from memory"""
+    for load in (_cached_inventory, _cached_users, _cached_waste_log):
+        try:
+            load()
+        except (ValueError, KeyError, csv.Error, OSError):
+            # A malformed or unreadable file is reported by the page that reads it; startup goes on
+            logger.warning('Could not pre-load a CSV file at startup', exc_info=True)
+
+def _create_default_users_file():
+    """Create users.csv with the default admin user unless another process got there first"""
+    try:
+        # Exclusive create, so when several workers start together only one pays for the hash
+        file = open(USERS_FILE, 'x', newline='')
+    except FileExistsError:
+        return
+    with file:
+        writer = csv.DictWriter(file, fieldnames=['username', 'password_hash', 'role', 'email'])
+        writer.writeheader()
+        # Create default admin user
+        admin_user = {
+            'username': 'admin',
+            'password_hash': hash_password('admin123'),
+            'role': 'admin',
+            'email': 'admin@healthpackmeals.com'
+        }
+        writer.writerow(admin_user)
+
 def initialize_csv_files():
     """Initialize CSV files with headers if they don't exist"""
+    # One directory listing instead of a stat() per data file
+    with os.scandir('.') as entries:
+        existing = {entry.name for entry in entries}
     
     # Initialize inventory.csv
-    if not os.path.exists(INVENTORY_FILE):
+    if INVENTORY_FILE not in existing:
         with open(INVENTORY_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['name', 'unit', 'quantity', 'par_level', 'category', 'unit_cost', 'vendors', 'last_updated'])
             writer.writeheader()
     
     # Initialize users.csv with default admin user
-    if not os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=['username', 'password_hash', 'role', 'email'])
-            writer.writeheader()
-            # Create default admin user
-            admin_user = {
-                'username': 'admin',
-                'password_hash': generate_password_hash('admin123'),
-                'role': 'admin',
-                'email': 'admin@healthpackmeals.com'
-            }
-            writer.writerow(admin_user)
+    if USERS_FILE not in existing:
+        _create_default_users_file()
     
     # Initialize waste_log.csv
-    if not os.path.exists(WASTE_LOG_FILE):
+    if WASTE_LOG_FILE not in existing:
         with open(WASTE_LOG_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost'])
             writer.writeheader()
     
     # Initialize vendors.csv with default vendors
-    if not os.path.exists(VENDORS_FILE):
+    if VENDORS_FILE not in existing:
         with open(VENDORS_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['name', 'contact_info', 'address', 'phone', 'email'])
             writer.writeheader()
@@ -71,166 +205,430 @@ def initialize_csv_files():
     
 
     # Initialize categories.csv with default categories
-    if not os.path.exists(CATEGORIES_FILE):
+    if CATEGORIES_FILE not in existing:
         with open(CATEGORIES_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['name', 'description', 'created_date'])
             writer.writeheader()
-            # Add default categories
+            # Add default categories, all stamped with the same creation time
+            created_date = format_timestamp(datetime.now())
             for category_name in DEFAULT_CATEGORIES:
                 writer.writerow({
                     'name': category_name,
                     'description': f'Default {category_name} category',
-                    'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    'created_date': created_date
                 })
     
     # Initialize weekly reports
-    initialize_waste_archive()
+    initialize_waste_archive(existing)
     
     # Initialize weekly inventory reports
-    initialize_weekly_inventory_reports()
+    initialize_weekly_inventory_reports(existing)
+
+def _parse_inventory_rows(reader) -> List[InventoryItem]:
+    """Build inventory items from csv.reader rows"""
+    columns = _header_columns(reader)
+    if columns is None:
+        return []
+    width = len(columns)
+    # Short rows read as empty trailing fields
+    rows = [row if len(row) >= width else row + [''] * (width - len(row)) for row in reader if row]
+    if not rows:
+        return []
+    # Transpose once and convert whole columns, so the per-cell work runs in C
+    fields = list(zip(*rows))
+    count = len(rows)
+
+    def column(name, default):
+        i = columns.get(name)
+        return fields[i] if i is not None else (default,) * count
+
+    return list(map(
+        InventoryItem,
+        fields[columns['name']],
+        fields[columns['unit']],
+        map(float, fields[columns['quantity']]),
+        map(int, fields[columns['par_level']]),
+        column('category', 'General'),
+        map(float, column('unit_cost', 0.0)),
+        column('vendors', ''),
+        column('last_updated', '')
+    ))
+
+def _cached_inventory() -> List[InventoryItem]:
+    """Shared parsed inventory; callers must not mutate the list or its items"""
+    try:
+        return _load_csv_cached(INVENTORY_FILE, _parse_inventory_rows)
+    except FileNotFoundError:
+        return []
+
+def _inventory_index() -> Dict[str, InventoryItem]:
+    """Name to item lookup for the cached inventory"""
+    # Reversed so the first item with a given name wins, as with a linear scan
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'by_name',
+                          lambda items: {item.name: item for item in reversed(items)})
+
+def _inventory_positions() -> Dict[str, int]:
+    """Name to list position lookup for the cached inventory"""
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'positions',
+                          lambda items: {items[i].name: i for i in range(len(items) - 1, -1, -1)})
+
+@contextmanager
+def _atomic_write(path: str, cache_rows: Optional[list] = None):
+    """Open a temp file next to path and move it over path once fully written, caching cache_rows as its parse"""
+    # Per-thread temp name so concurrent writers never share a partial file
+    tmp_path = '%s.%d-%d.tmp' % (path, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp_path, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        # Replace, stat and cache together, as appends do, so no other writer's rows
+        # end up cached under this file's stamp; without cache_rows the parse is dropped
+        with _csv_cache_lock:
+            os.replace(tmp_path, path)
+            if cache_rows is not None:
+                _store_csv_cache(path, cache_rows)
+            else:
+                _invalidate_csv_cache(path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _store_csv_cache(path: str, rows: list, derived: Optional[dict] = None):
+    """Seed the cache with rows just written so the next read skips parsing"""
+    st = os.stat(path)
+    _csv_cache[path] = ((st.st_mtime_ns, st.st_size), rows, derived if derived is not None else {})
+
+def _inventory_partition() -> Tuple[tuple, tuple, frozenset]:
+    """HPM items, non-HPM items and HPM item names for the cached inventory"""
+    def build(items):
+        hpm_items = []
+        other_items = []
+        hpm_names = set()
+        for item in items:
+            # The substring test rules out most items before splitting their vendor list
+            if 'HPM' in item.vendors and 'HPM' in item.get_vendors():
+                hpm_items.append(item)
+                hpm_names.add(item.name)
+            else:
+                other_items.append(item)
+        return tuple(hpm_items), tuple(other_items), frozenset(hpm_names)
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'hpm_partition', build)
+
+def _inventory_low_stock() -> Tuple[tuple, tuple, tuple]:
+    """All low-stock items, the HPM ones and the non-HPM ones for the cached inventory"""
+    def build(items):
+        # Select low-stock items with the is_low_stock() test inlined, then split only those
+        low_stock = [item for item in items if item.quantity <= item.par_level]
+        hpm_low_stock = []
+        other_low_stock = []
+        for item in low_stock:
+            if 'HPM' in item.vendors and 'HPM' in item.get_vendors():
+                hpm_low_stock.append(item)
+            else:
+                other_low_stock.append(item)
+        return tuple(low_stock), tuple(hpm_low_stock), tuple(other_low_stock)
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'low_stock', build)
+
+def get_item_categories() -> Dict[str, str]:
+    """Item name to category lookup for the cached inventory"""
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'categories',
+                          lambda items: {item.name: item.category for item in items})
 
 def read_inventory() -> List[InventoryItem]:
     """Read inventory items from CSV file"""
-    items = []
-    try:
-        with open(INVENTORY_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                item = InventoryItem(
-                    name=row['name'],
-                    unit=row['unit'],
-                    quantity=float(row['quantity']),
-                    par_level=int(row['par_level']),
-                    category=row.get('category', 'General'),
-                    unit_cost=float(row.get('unit_cost', 0.0)),
-                    vendors=row.get('vendors', ''),
-                    last_updated=row.get('last_updated', '')
-                )
-                items.append(item)
-    except FileNotFoundError:
-        pass
-    return items
+    return list(_cached_inventory())
+
+def read_hpm_inventory() -> List[InventoryItem]:
+    """Read inventory items supplied by HPM"""
+    return list(_inventory_partition()[0])
+
+def read_non_hpm_inventory() -> List[InventoryItem]:
+    """Read inventory items not supplied by HPM"""
+    return list(_inventory_partition()[1])
+
+def get_hpm_item_names() -> frozenset:
+    """Names of inventory items supplied by HPM"""
+    return _inventory_partition()[2]
 
 def write_inventory(items: List[InventoryItem]):
     """Write inventory items to CSV file"""
-    with open(INVENTORY_FILE, 'w', newline='') as file:
-        fieldnames = ['name', 'unit', 'quantity', 'par_level', 'category', 'unit_cost', 'vendors', 'last_updated']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
+    # Copies so later edits by the caller don't leak into the cached parse
+    write_inventory_stream(copy.copy(item) for item in items)
+
+def write_inventory_stream(items: Iterable[InventoryItem]) -> int:
+    """Write inventory items as they are produced; they become the cached parse, so must not be edited afterwards"""
+    written = []
+    keep = written.append
+    
+    def rows():
         for item in items:
-            writer.writerow(item.to_dict())
+            # Same types a fresh parse gives, so the cached items match a re-read of the file
+            if type(item.quantity) is not float:
+                item.quantity = float(item.quantity)
+            if type(item.unit_cost) is not float:
+                item.unit_cost = float(item.unit_cost)
+            if type(item.par_level) is not int:
+                item.par_level = int(item.par_level)
+            keep(item)
+            yield item.to_row()
+    
+    with _atomic_write(INVENTORY_FILE, written) as file:
+        writer = csv.writer(file)
+        writer.writerow(INVENTORY_FIELDS)
+        writer.writerows(rows())
+    return len(written)
 
 def get_inventory_item(name: str) -> Optional[InventoryItem]:
     """Get a specific inventory item by name"""
-    items = read_inventory()
-    for item in items:
-        if item.name == name:
-            return item
-    return None
+    item = _inventory_index().get(name)
+    # Hand out a copy so callers can edit it without touching the cache
+    return copy.copy(item) if item is not None else None
 
 def update_inventory_item(name: str, updated_item: InventoryItem) -> bool:
     """Update a specific inventory item"""
-    items = read_inventory()
-    for i, item in enumerate(items):
-        if item.name == name:
-            items[i] = updated_item
-            write_inventory(items)
-            return True
-    return False
+    index = _inventory_positions().get(name)
+    if index is None:
+        return False
+    # The untouched items are the cached ones, shared as-is; only the new item is copied
+    replacement = copy.copy(updated_item)
+    write_inventory_stream(replacement if i == index else item
+                           for i, item in enumerate(_cached_inventory()))
+    return True
 
 def delete_inventory_item(name: str) -> bool:
     """Delete a specific inventory item"""
-    items = read_inventory()
-    original_length = len(items)
-    items = [item for item in items if item.name != name]
-    if len(items) < original_length:
-        write_inventory(items)
-        return True
-    return False
+    if name not in _inventory_positions():
+        return False
+    write_inventory_stream(item for item in _cached_inventory() if item.name != name)
+    return True
 
-def read_users() -> List[User]:
-    """Read users from CSV file"""
+def _parse_user_rows(reader) -> List[User]:
+    """Build users from csv.reader rows"""
+    columns = _header_columns(reader)
+    if columns is None:
+        return []
+    username_i, password_hash_i, role_i = columns['username'], columns['password_hash'], columns['role']
+    email_i = columns.get('email')
+    width = len(columns)
     users = []
+    append = users.append
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        append(User(
+            username=row[username_i],
+            password_hash=row[password_hash_i],
+            role=row[role_i],
+            email=row[email_i] if email_i is not None else ''
+        ))
+    return users
+
+def _cached_users() -> List[User]:
+    """Shared parsed users; callers must not mutate the list or its items"""
     try:
-        with open(USERS_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                user = User(
-                    username=row['username'],
-                    password_hash=row['password_hash'],
-                    role=row['role'],
-                    email=row.get('email', '')
-                )
-                users.append(user)
+        return _load_csv_cached(USERS_FILE, _parse_user_rows)
     except FileNotFoundError:
-        pass
-    return users
+        return []
+
+def read_users() -> List[User]:
+    """Read users from CSV file"""
+    return list(_cached_users())
 
 def get_user(username: str) -> Optional[User]:
     """Get a specific user by username"""
-    users = read_users()
+    # Reversed so the first user with a given name wins, as with a linear scan
+    users_by_name = _cached_lookup(USERS_FILE, _cached_users, 'by_username',
+                                   lambda users: {user.username: user for user in reversed(users)})
+    user = users_by_name.get(username)
+    return copy.copy(user) if user is not None else None
+
+# Werkzeug hash method for new passwords, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+# existing hashes keep verifying with whatever method they were created with
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+
+def hash_password(password: str) -> str:
+    """Hash a password with the configured method"""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+# Successful password checks as (stored hash, keyed digest of the password);
+# the per-process key keeps the digests useless outside this process
+_verified_passwords = set()
+_VERIFY_DIGEST_KEY = os.urandom(32)
+_VERIFY_CACHE_SIZE = 1024
+
+def _check_password_cached(password_hash: str, password: str) -> bool:
+    """check_password_hash that skips the slow KDF for an already verified password"""
+    digest = hashlib.blake2b(password.encode('utf-8'), key=_VERIFY_DIGEST_KEY, digest_size=32).digest()
+    key = (password_hash, digest)
+    if key in _verified_passwords:
+        return True
+    # Only successes are cached, so wrong guesses always pay the full hash cost
+    if not check_password_hash(password_hash, password):
+        return False
+    if len(_verified_passwords) >= _VERIFY_CACHE_SIZE:
+        _verified_passwords.clear()
+    _verified_passwords.add(key)
+    return True
+
+# Hashes checked against for unknown usernames, by Werkzeug method; created on first use
+_dummy_password_hashes = {}
+
+def _stored_hash_method(users: List[User]) -> str:
+    """Hash method most stored passwords use, such as scrypt:32768:8:1"""
+    methods = {}
     for user in users:
-        if user.username == username:
-            return user
-    return None
+        method = user.password_hash.split('$', 1)[0]
+        methods[method] = methods.get(method, 0) + 1
+    return max(methods, key=methods.get) if methods else PASSWORD_HASH_METHOD
+
+def _get_dummy_password_hash() -> str:
+    """Password hash costing what real users' hashes cost, used to time unknown-user logins"""
+    # Match the stored hashes rather than the configured method, which may have changed since
+    method = _cached_lookup(USERS_FILE, _cached_users, 'hash_method', _stored_hash_method)
+    dummy = _dummy_password_hashes.get(method)
+    if dummy is None:
+        try:
+            dummy = generate_password_hash(os.urandom(16).hex(), method=method)
+        except ValueError:
+            # Unrecognized method in the users file
+            dummy = hash_password(os.urandom(16).hex())
+        _dummy_password_hashes[method] = dummy
+    return dummy
 
 def authenticate_user(username: str, password: str) -> Optional[User]:
     """Authenticate user with username and password"""
     user = get_user(username)
-    if user and check_password_hash(user.password_hash, password):
+    if user is None:
+        # Pay the same hashing cost as a real user so timing doesn't reveal valid usernames
+        check_password_hash(_get_dummy_password_hash(), password)
+        return None
+    if _check_password_cached(user.password_hash, password):
         return user
     return None
 
-def read_waste_log() -> List[WasteEntry]:
-    """Read waste log entries from CSV file"""
+def _parse_waste_rows(reader) -> List[WasteEntry]:
+    """Build waste entries from csv.reader rows, skipping malformed ones"""
+    columns = _header_columns(reader)
+    if columns is None:
+        return []
+    header = list(columns)
+    item_name_i = columns.get('item_name')
+    quantity_i = columns.get('quantity')
+    unit_i = columns.get('unit')
+    reason_i = columns.get('reason')
+    date_i = columns.get('date')
+    logged_by_i = columns.get('logged_by')
+    unit_cost_i = columns.get('unit_cost')
+    missing = [name for name in ('item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by') if name not in columns]
+    width = len(columns)
+    # Loop-invariant names bound as locals
+    to_float, new_entry = float, WasteEntry
     entries = []
+    append = entries.append
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        try:
+            if missing:
+                raise KeyError(missing[0])
+            # Clean up the unit_cost field to handle any parsing issues
+            unit_cost_str = row[unit_cost_i] if unit_cost_i is not None else '0.0'
+            if unit_cost_str.replace('.', '').isdecimal():
+                # Already just digits and dots, which is what the regex would keep
+                unit_cost = to_float(unit_cost_str)
+            else:
+                # Extract only numeric characters and decimal point
+                unit_cost_clean = _UNIT_COST_RE.match(unit_cost_str)
+                unit_cost = to_float(unit_cost_clean.group()) if unit_cost_clean else 0.0
+            
+            append(new_entry(
+                item_name=row[item_name_i],
+                quantity=to_float(row[quantity_i]),
+                unit=row[unit_i],
+                reason=row[reason_i],
+                date=row[date_i],
+                logged_by=row[logged_by_i],
+                unit_cost=unit_cost
+            ))
+        except (ValueError, KeyError) as e:
+            # Skip malformed entries and log the error
+            print(f"Skipping malformed waste log entry: {dict(zip(header, row))}, Error: {e}")
+            continue
+    return entries
+
+def _cached_waste_log() -> List[WasteEntry]:
+    """Shared parsed waste log; callers must not mutate the list or its items"""
     try:
-        with open(WASTE_LOG_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    # Clean up the unit_cost field to handle any parsing issues
-                    unit_cost_str = row.get('unit_cost', '0.0')
-                    # Extract only numeric characters and decimal point
-                    import re
-                    unit_cost_clean = re.match(r'^[\d.]+', str(unit_cost_str))
-                    unit_cost = float(unit_cost_clean.group()) if unit_cost_clean else 0.0
-                    
-                    entry = WasteEntry(
-                        item_name=row['item_name'],
-                        quantity=float(row['quantity']),
-                        unit=row['unit'],
-                        reason=row['reason'],
-                        date=row['date'],
-                        logged_by=row['logged_by'],
-                        unit_cost=unit_cost
-                    )
-                    entries.append(entry)
-                except (ValueError, KeyError) as e:
-                    # Skip malformed entries and log the error
-                    print(f"Skipping malformed waste log entry: {row}, Error: {e}")
-                    continue
+        return _load_csv_cached(WASTE_LOG_FILE, _parse_waste_rows)
     except FileNotFoundError:
-        pass
-    return entries
+        return []
+
+def read_waste_log() -> List[WasteEntry]:
+    """Read waste log entries from CSV file"""
+    return list(_cached_waste_log())
+
+def _csv_appendable(path: str, fields: List[str]) -> bool:
+    """Check a CSV file has exactly this header and ends on a line break"""
+    try:
+        with open(path, 'rb') as file:
+            header = file.readline()
+            file.seek(-1, os.SEEK_END)
+            last_byte = file.read(1)
+    except (FileNotFoundError, OSError):
+        return False
+    return header.rstrip(b'\r\n') == ','.join(fields).encode() and last_byte in (b'\n', b'\r')
+
+def _append_csv_rows(path: str, rows, new_items: list, carry_derived=None):
+    """Append rows to a CSV file, extending its cached parse with new_items when that is current"""
+    # carry_derived(old_derived) may return derived values still valid after the append
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    data = buffer.getvalue()
+    # Held so appends from other threads can't land between the stat and the cache update
+    with _csv_cache_lock:
+        cached = _csv_cache.get(path)
+        st = os.stat(path)
+        with open(path, 'a', newline='') as file:
+            start = file.tell()
+            file.write(data)
+            file.flush()
+            end = file.tell()
+            written = len(data.encode(file.encoding))
+        # Extend an up-to-date cached parse instead of re-reading the whole file,
+        # unless another process appended to it since we looked
+        if (cached is not None and cached[0] == (st.st_mtime_ns, st.st_size)
+                and start == st.st_size and end - start == written):
+            derived = carry_derived(cached[2]) if carry_derived is not None else None
+            _store_csv_cache(path, cached[1] + [copy.copy(item) for item in new_items], derived)
+        else:
+            _invalidate_csv_cache(path)
+
+def add_waste_entries(entries: List[WasteEntry]):
+    """Append several waste log entries with a single file open"""
+    if not entries:
+        return
+    if not _csv_appendable(WASTE_LOG_FILE, WASTE_LOG_FIELDS):
+        # Missing file or a layout we can't safely append to: rewrite it whole
+        write_waste_log(read_waste_log() + list(entries))
+        return
+    _append_csv_rows(WASTE_LOG_FILE, [entry.to_row() for entry in entries], entries, _carry_oldest_waste_date(entries))
 
 def add_waste_entry(entry: WasteEntry):
     """Add a new waste log entry"""
-    # Read existing entries
-    entries = read_waste_log()
-    # Add new entry
-    entries.append(entry)
-    # Write all entries back to ensure proper formatting
-    write_waste_log(entries)
+    add_waste_entries([entry])
 
 def write_waste_log(entries: List[WasteEntry]):
     """Write waste log entries to CSV file"""
-    with open(WASTE_LOG_FILE, 'w', newline='') as file:
-        fieldnames = ['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        for entry in entries:
-            writer.writerow(entry.to_dict())
+    with _atomic_write(WASTE_LOG_FILE) as file:
+        writer = csv.writer(file)
+        writer.writerow(WASTE_LOG_FIELDS)
+        writer.writerows(entry.to_row() for entry in entries)
 
 def update_waste_entry(entry_index: int, updated_entry: WasteEntry) -> bool:
     """Update a waste log entry by index"""
@@ -266,133 +664,226 @@ def get_waste_entry(entry_index: int) -> Optional[WasteEntry]:
     except Exception:
         return None
 
+def sum_stock_value(items: List[InventoryItem]) -> float:
+    """Total stock value (quantity * unit_cost) of the given items"""
+    # The inlined product beats sum(map(methodcaller('total_value'), ...)) and operator.mul maps
+    return sum([item.quantity * item.unit_cost for item in items])
+
+def sum_waste_value(entries: List[WasteEntry]) -> float:
+    """Total wasted value (quantity * unit_cost) of the given entries"""
+    return sum([entry.quantity * entry.unit_cost for entry in entries])
+
 def get_low_stock_items() -> List[InventoryItem]:
     """Get all items that are below par level (excluding HPM items)"""
-    items = read_inventory()
-    return [item for item in items if item.is_low_stock() and 'HPM' not in item.get_vendors()]
+    return list(_inventory_low_stock()[2])
 
-def export_inventory_csv() -> str:
-    """Export inventory data as CSV string"""
-    items = read_inventory()
+def _render_inventory_csv(items: List[InventoryItem]) -> str:
+    """Serialize inventory items as CSV text with a header row"""
     if not items:
         return ""
     
-    output = "name,unit,quantity,par_level,category,unit_cost,vendors,last_updated\n"
-    for item in items:
-        output += f"{item.name},{item.unit},{item.quantity},{item.par_level},{item.category},{item.unit_cost},{item.vendors},{item.last_updated}\n"
-    return output
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(INVENTORY_FIELDS)
+    writer.writerows(item.to_row() for item in items)
+    return output.getvalue()
+
+def export_inventory_csv() -> str:
+    """Export inventory data as CSV string"""
+    # Serialized once per version of the inventory file
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'export_csv', _render_inventory_csv)
+
+def export_inventory_csv_bytes() -> bytes:
+    """export_inventory_csv encoded as UTF-8, ready to send as a download"""
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'export_csv_bytes',
+                          lambda items: export_inventory_csv().encode('utf-8'))
+
+# Row errors listed in a failed import's message; the rest are only counted
+MAX_IMPORT_ERRORS = 5
 
-def import_inventory_csv(csv_data: str) -> tuple[bool, str]:
-    """Import inventory data from CSV string"""
+def import_inventory_csv(csv_data) -> tuple[bool, str]:
+    """Import inventory data from a CSV string or text stream"""
     try:
-        lines = csv_data.strip().split('\n')
-        if len(lines) < 2:
+        # Accept an open text stream so uploads are parsed row by row
+        if isinstance(csv_data, str):
+            csv_data = io.StringIO(csv_data)
+        reader = csv.reader(csv_data)
+
+        # Parse header, skipping blank lines before it as strip() used to
+        header = next((row for row in reader if any(field.strip() for field in row)), None)
+        if header:
+            header[0] = header[0].lstrip()
+        if not header:
             return False, "CSV must have at least a header and one data row"
-        
-        # Parse header
-        header = lines[0].split(',')
         required_fields = ['name', 'unit', 'quantity', 'par_level']
-        
-        for field in required_fields:
-            if field not in header:
-                return False, f"Missing required field: {field}"
-        
-        # Parse data rows
+
+        # Report every missing column at once rather than one per upload attempt
+        missing = [field for field in required_fields if field not in header]
+        if len(missing) == 1:
+            return False, f"Missing required field: {missing[0]}"
+        if missing:
+            return False, f"Missing required fields: {', '.join(missing)}"
+
+        # Resolve column positions once; optional columns fall back to defaults
+        columns = {name: index for index, name in enumerate(header)}
+        width = len(header)
+        name_i, unit_i = columns['name'], columns['unit']
+        quantity_i, par_level_i = columns['quantity'], columns['par_level']
+        category_i = columns.get('category')
+        unit_cost_i = columns.get('unit_cost')
+        vendors_i = columns.get('vendors')
+
+        # Every imported item shares one import timestamp
+        now_str = format_timestamp(datetime.now())
+
+        # Parse data rows, collecting row errors so one upload reports them together
         items = []
-        for i, line in enumerate(lines[1:], 2):
+        errors = []
+        for row in reader:
+            # Blank and whitespace-only lines carry no item
+            if not row or (len(row) == 1 and not row[0].strip()):
+                continue
+            i = reader.line_num
             try:
-                values = line.split(',')
-                if len(values) != len(header):
-                    return False, f"Row {i}: Number of values doesn't match header"
-                
-                row_data = dict(zip(header, values))
+                if len(row) != width:
+                    errors.append(f"Row {i}: Number of values doesn't match header")
+                    continue
+
                 item = InventoryItem(
-                    name=row_data['name'].strip(),
-                    unit=row_data['unit'].strip(),
-                    quantity=int(row_data['quantity']),
-                    par_level=int(row_data['par_level']),
-                    category=row_data.get('category', 'General').strip(),
-                    unit_cost=float(row_data.get('unit_cost', 0.0)),
-                    vendors=row_data.get('vendors', '').strip(),
-                    last_updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    name=row[name_i].strip(),
+                    unit=row[unit_i].strip(),
+                    quantity=float(row[quantity_i]),
+                    par_level=int(row[par_level_i]),
+                    category=row[category_i].strip() if category_i is not None else 'General',
+                    unit_cost=float(row[unit_cost_i]) if unit_cost_i is not None else 0.0,
+                    vendors=row[vendors_i].strip() if vendors_i is not None else '',
+                    last_updated=now_str
                 )
-                items.append(item)
+                # Once a row has failed nothing is written, so stop holding items
+                if not errors:
+                    items.append(item)
             except ValueError as e:
-                return False, f"Row {i}: Invalid data format - {str(e)}"
-        
-        # Write to file
-        write_inventory(items)
+                errors.append(f"Row {i}: Invalid data format - {str(e)}")
+
+        if errors:
+            message = '; '.join(errors[:MAX_IMPORT_ERRORS])
+            if len(errors) > MAX_IMPORT_ERRORS:
+                message += f" (and {len(errors) - MAX_IMPORT_ERRORS} more)"
+            return False, message
+
+        if not items:
+            return False, "CSV must have at least a header and one data row"
+
+        # Write to file; the items were built here, so they can be cached without copying
+        write_inventory_stream(items)
         return True, f"Successfully imported {len(items)} items"
         
     except Exception as e:
         return False, f"Error parsing CSV: {str(e)}"
 
 # Vendor management functions
-def read_vendors() -> List[Vendor]:
-    """Read vendors from CSV file"""
+def _parse_vendor_rows(reader) -> List[Vendor]:
+    """Build vendors from csv.reader rows"""
+    columns = _header_columns(reader)
+    if columns is None:
+        return []
+    name_i = columns['name']
+    optional_i = [columns.get(field) for field in ('contact_info', 'address', 'phone', 'email')]
+    exclude_i = columns.get('exclude_from_shopping_list')
+    width = len(columns)
     vendors = []
+    append = vendors.append
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        contact_info, address, phone, email = [row[i] if i is not None else '' for i in optional_i]
+        append(Vendor(
+            name=row[name_i],
+            contact_info=contact_info,
+            address=address,
+            phone=phone,
+            email=email,
+            exclude_from_shopping_list=exclude_i is not None and row[exclude_i].lower() == 'true'
+        ))
+    return vendors
+
+def _cached_vendors() -> List[Vendor]:
+    """Shared parsed vendors; callers must not mutate the list or its items"""
     try:
-        with open(VENDORS_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                vendor = Vendor(
-                    name=row['name'],
-                    contact_info=row.get('contact_info', ''),
-                    address=row.get('address', ''),
-                    phone=row.get('phone', ''),
-                    email=row.get('email', ''),
-                    exclude_from_shopping_list=row.get('exclude_from_shopping_list', 'False').lower() == 'true'
-                )
-                vendors.append(vendor)
+        return _load_csv_cached(VENDORS_FILE, _parse_vendor_rows)
     except FileNotFoundError:
-        pass
-    return vendors
+        return []
+
+def _vendor_index() -> Dict[str, Vendor]:
+    """Name to vendor lookup for the cached vendors"""
+    # Reversed so the first vendor with a given name wins, as with a linear scan
+    return _cached_lookup(VENDORS_FILE, _cached_vendors, 'by_name',
+                          lambda vendors: {vendor.name: vendor for vendor in reversed(vendors)})
+
+def _vendor_positions() -> Dict[str, int]:
+    """Name to list position lookup for the cached vendors"""
+    return _cached_lookup(VENDORS_FILE, _cached_vendors, 'positions',
+                          lambda vendors: {vendors[i].name: i for i in range(len(vendors) - 1, -1, -1)})
+
+def get_shopping_excluded_vendors() -> frozenset:
+    """Names of vendors marked to be left off the shopping list"""
+    return _cached_lookup(VENDORS_FILE, _cached_vendors, 'shopping_excluded',
+                          lambda vendors: frozenset(vendor.name for vendor in vendors
+                                                    if vendor.exclude_from_shopping_list))
+
+def read_vendors() -> List[Vendor]:
+    """Read vendors from CSV file"""
+    return list(_cached_vendors())
 
 def write_vendors(vendors: List[Vendor]):
     """Write vendors to CSV file"""
-    with open(VENDORS_FILE, 'w', newline='') as file:
-        fieldnames = ['name', 'contact_info', 'address', 'phone', 'email', 'exclude_from_shopping_list']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        for vendor in vendors:
-            writer.writerow(vendor.to_dict())
+    with _atomic_write(VENDORS_FILE) as file:
+        writer = csv.writer(file)
+        writer.writerow(VENDOR_FIELDS)
+        writer.writerows(vendor.to_row() for vendor in vendors)
 
 def get_vendor(name: str) -> Optional[Vendor]:
     """Get a specific vendor by name"""
-    vendors = read_vendors()
-    for vendor in vendors:
-        if vendor.name == name:
-            return vendor
-    return None
+    vendor = _vendor_index().get(name)
+    # Hand out a copy so callers can edit it without touching the cache
+    return copy.copy(vendor) if vendor is not None else None
 
 def add_vendor(vendor: Vendor) -> bool:
     """Add a new vendor"""
-    vendors = read_vendors()
     # Check if vendor already exists
-    if any(v.name == vendor.name for v in vendors):
+    if vendor.name in _vendor_index():
         return False
-    vendors.append(vendor)
-    write_vendors(vendors)
+    if not _csv_appendable(VENDORS_FILE, VENDOR_FIELDS):
+        # Older files lack the exclusion column: rewrite them in the current layout
+        vendors = read_vendors()
+        vendors.append(vendor)
+        write_vendors(vendors)
+        return True
+    _append_csv_rows(VENDORS_FILE, [vendor.to_row()], [vendor])
     return True
 
 def update_vendor(old_name: str, updated_vendor: Vendor) -> bool:
     """Update an existing vendor"""
     try:
+        index = _vendor_positions().get(old_name)
+        if index is None:
+            return False
         vendors = read_vendors()
-        for i, vendor in enumerate(vendors):
-            if vendor.name == old_name:
-                vendors[i] = updated_vendor
-                write_vendors(vendors)
-                return True
-        return False
+        vendors[index] = updated_vendor
+        write_vendors(vendors)
+        return True
     except Exception:
         return False
 
 def delete_vendor(name: str) -> bool:
     """Delete a vendor"""
     try:
-        vendors = read_vendors()
-        vendors = [vendor for vendor in vendors if vendor.name != name]
+        # Nothing to rewrite when no vendor has this name
+        if name not in _vendor_positions():
+            return True
+        vendors = [vendor for vendor in _cached_vendors() if vendor.name != name]
         write_vendors(vendors)
         return True
     except Exception:
@@ -400,205 +891,247 @@ def delete_vendor(name: str) -> bool:
 
 def is_vendor_in_use(vendor_name: str) -> bool:
     """Check if a vendor is being used by any inventory items"""
-    items = read_inventory()
-    for item in items:
-        if vendor_name in item.get_vendors():
-            return True
-    return False
+    return vendor_name in compute_vendor_and_category_usage()[0]
+
+def compute_vendor_and_category_usage() -> Tuple[frozenset, frozenset]:
+    """Collect the vendor and category names used by inventory items in one pass"""
+    def build(items):
+        used_vendors = set()
+        used_categories = set()
+        for item in items:
+            used_vendors.update(item.get_vendors())
+            used_categories.add(item.category)
+        return frozenset(used_vendors), frozenset(used_categories)
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'usage', build)
 
 
 
 # Filtering and search functions
+def _inventory_by_vendor() -> Dict[str, tuple]:
+    """Vendor name to the cached inventory items it supplies, in inventory order"""
+    def build(items):
+        by_vendor = {}
+        for item in items:
+            # dict.fromkeys drops a vendor listed twice on the same item
+            for vendor in dict.fromkeys(item.get_vendors()):
+                by_vendor.setdefault(vendor, []).append(item)
+        return {vendor: tuple(vendor_items) for vendor, vendor_items in by_vendor.items()}
+    return _cached_lookup(INVENTORY_FILE, _cached_inventory, 'by_vendor', build)
+
 def filter_inventory(category: str = None, vendor: str = None, low_stock_only: bool = False) -> List[InventoryItem]:
     """Filter inventory items based on criteria"""
-    items = read_inventory()
-    
-    if category:
-        items = [item for item in items if item.category == category]
-    
     if vendor:
-        items = [item for item in items if vendor in item.get_vendors()]
-    
-    if low_stock_only:
-        items = [item for item in items if item.is_low_stock()]
-    
-    return items
-
-def get_shopping_list_items() -> List[InventoryItem]:
-    """Get items that need to be restocked (low stock items), excluding items from excluded vendors and HPM items"""
-    low_stock_items = filter_inventory(low_stock_only=True)
-    
-    # Get excluded vendors
-    excluded_vendors = set()
-    vendors = read_vendors()
-    for vendor in vendors:
-        if vendor.exclude_from_shopping_list:
-            excluded_vendors.add(vendor.name)
+        # Only the items this vendor supplies need checking
+        items = _inventory_by_vendor().get(vendor, ())
+        return [
+            item for item in items
+            if (not category or item.category == category)
+            and (not low_stock_only or item.is_low_stock())
+        ]
+    # Start from the cached low-stock items when only those are wanted
+    items = _inventory_low_stock()[0] if low_stock_only else _cached_inventory()
+    if not category:
+        return list(items)
+    return [item for item in items if item.category == category]
+
+def _shopping_list_and_excluded_vendors() -> Tuple[List[InventoryItem], frozenset]:
+    """Shopping list items plus the vendors marked as excluded"""
+    # Get excluded vendors, kept with the parsed vendors file
+    excluded_vendors = get_shopping_excluded_vendors()
     
     # Always exclude HPM items from main shopping list
-    excluded_vendors.add('HPM')
+    skipped_vendors = excluded_vendors | {'HPM'}
     
-    # Filter out items from excluded vendors
+    # Filter the cached low-stock items, skipping those whose vendors are all excluded
+    all_skipped = skipped_vendors.issuperset
     filtered_items = []
-    for item in low_stock_items:
+    for item in _inventory_low_stock()[0]:
         item_vendors = item.get_vendors()
-        if not item_vendors:  # Items with no vendor are included
+        # Items with no vendor are included
+        if not item_vendors or not all_skipped(item_vendors):
             filtered_items.append(item)
-        else:
-            # Include item if it has at least one non-excluded vendor
-            if not all(vendor in excluded_vendors for vendor in item_vendors):
-                filtered_items.append(item)
     
-    return filtered_items
+    return filtered_items, excluded_vendors
+
+def get_shopping_list_items() -> List[InventoryItem]:
+    """Get items that need to be restocked (low stock items), excluding items from excluded vendors and HPM items"""
+    return _shopping_list_and_excluded_vendors()[0]
 
 
 
 # PDF generation functions
+
+# PDF styles are built once at import; reportlab only reads them while rendering
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    textColor=colors.darkblue
+)
+_SHOPPING_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
 def generate_shopping_list_pdf() -> bytes:
     """Generate shopping list PDF for low stock items"""
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
+    write_shopping_list_pdf(buffer)
+    return buffer.getvalue()
+
+def write_shopping_list_pdf(output):
+    """Render the shopping list PDF into a binary file-like object"""
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    styles = _PDF_STYLES
     story = []
     
     # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        textColor=colors.darkblue
-    )
-    story.append(Paragraph("Health Pack Meals - Shopping List", title_style))
-    story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    story.append(Paragraph("Health Pack Meals - Shopping List", _PDF_TITLE_STYLE))
+    story.append(Paragraph(f"Generated: {format_timestamp(datetime.now())}", styles['Normal']))
     story.append(Spacer(1, 20))
     
-    # Get low stock items
-    low_stock_items = get_shopping_list_items()
+    # Get low stock items and the excluded vendors they were filtered with
+    low_stock_items, excluded_vendors = _shopping_list_and_excluded_vendors()
     
     if not low_stock_items:
         story.append(Paragraph("No items are currently low in stock.", styles['Normal']))
     else:
-        # Get excluded vendors
-        excluded_vendors = set()
-        vendors = read_vendors()
-        for vendor in vendors:
-            if vendor.exclude_from_shopping_list:
-                excluded_vendors.add(vendor.name)
-        
-        # Group items by vendor, excluding excluded vendors
+        # Group items by vendor, excluding excluded vendors; each item's row is
+        # formatted once even when it is listed under several vendors
         vendor_groups = {}
         for item in low_stock_items:
-            item_vendors = item.get_vendors() if item.get_vendors() else ['No Vendor Assigned']
+            needed = item.quantity_needed()
+            item_cost = needed * item.unit_cost
+            row = [
+                item.name,
+                str(item.quantity),
+                str(item.par_level),
+                str(needed),
+                item.unit,
+                f"${item.unit_cost:.2f}",
+                f"${item_cost:.2f}"
+            ]
+            item_vendors = item.get_vendors() or ['No Vendor Assigned']
             for vendor in item_vendors:
                 if vendor not in excluded_vendors:  # Skip excluded vendors
-                    if vendor not in vendor_groups:
-                        vendor_groups[vendor] = []
-                    vendor_groups[vendor].append(item)
+                    vendor_groups.setdefault(vendor, []).append((row, item_cost))
         
         # Create table for each vendor
-        for vendor, items in vendor_groups.items():
+        for vendor, rows in vendor_groups.items():
             story.append(Paragraph(f"Vendor: {vendor}", styles['Heading2']))
             
             # Table data
             table_data = [['Item Name', 'Current Stock', 'Par Level', 'Needed', 'Unit', 'Unit Cost', 'Total Cost']]
             total_cost = 0
             
-            for item in items:
-                needed = item.quantity_needed()
-                item_cost = needed * item.unit_cost
+            for row, item_cost in rows:
                 total_cost += item_cost
-                
-                table_data.append([
-                    item.name,
-                    str(item.quantity),
-                    str(item.par_level),
-                    str(needed),
-                    item.unit,
-                    f"${item.unit_cost:.2f}",
-                    f"${item_cost:.2f}"
-                ])
+                table_data.append(row)
             
             # Add total row
             table_data.append(['', '', '', '', '', 'Total:', f"${total_cost:.2f}"])
             
             # Create table
             table = Table(table_data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            table.setStyle(_SHOPPING_TABLE_STYLE)
             
             story.append(table)
             story.append(Spacer(1, 20))
     
     doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
 
 
 
 
 
 # Category Management Functions
-def read_categories() -> List[Category]:
-    """Read categories from CSV file"""
+def _parse_category_rows(reader) -> List[Category]:
+    """Build categories from csv.reader rows"""
+    columns = _header_columns(reader)
+    if columns is None:
+        return []
+    name_i = columns['name']
+    description_i = columns.get('description')
+    created_date_i = columns.get('created_date')
+    width = len(columns)
     categories = []
+    append = categories.append
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        append(Category(
+            name=row[name_i],
+            description=row[description_i] if description_i is not None else '',
+            created_date=row[created_date_i] if created_date_i is not None else ''
+        ))
+    return categories
+
+def _cached_categories() -> List[Category]:
+    """Shared parsed categories; callers must not mutate the list or its items"""
     try:
-        with open(CATEGORIES_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                category = Category(
-                    name=row['name'],
-                    description=row.get('description', ''),
-                    created_date=row.get('created_date', '')
-                )
-                categories.append(category)
+        return _load_csv_cached(CATEGORIES_FILE, _parse_category_rows)
     except FileNotFoundError:
         # If file doesn't exist, return default categories
-        for category_name in DEFAULT_CATEGORIES:
-            categories.append(Category(
-                name=category_name,
-                description=f'Default {category_name} category',
-                created_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            ))
-    return categories
+        created_date = format_timestamp(datetime.now())
+        return [Category(
+            name=category_name,
+            description=f'Default {category_name} category',
+            created_date=created_date
+        ) for category_name in DEFAULT_CATEGORIES]
+
+def _category_index() -> Dict[str, Category]:
+    """Name to category lookup for the cached categories"""
+    # Reversed so the first category with a given name wins, as with a linear scan
+    return _cached_lookup(CATEGORIES_FILE, _cached_categories, 'by_name',
+                          lambda categories: {category.name: category for category in reversed(categories)})
+
+def _category_positions() -> Dict[str, int]:
+    """Name to list position lookup for the cached categories"""
+    return _cached_lookup(CATEGORIES_FILE, _cached_categories, 'positions',
+                          lambda categories: {categories[i].name: i for i in range(len(categories) - 1, -1, -1)})
+
+def read_categories() -> List[Category]:
+    """Read categories from CSV file"""
+    return list(_cached_categories())
 
 def write_categories(categories: List[Category]):
     """Write categories to CSV file"""
-    with open(CATEGORIES_FILE, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['name', 'description', 'created_date'])
-        writer.writeheader()
-        for category in categories:
-            writer.writerow(category.to_dict())
+    with _atomic_write(CATEGORIES_FILE) as file:
+        writer = csv.writer(file)
+        writer.writerow(CATEGORY_FIELDS)
+        writer.writerows(category.to_row() for category in categories)
 
 def get_category(name: str) -> Optional[Category]:
     """Get a specific category by name"""
-    categories = read_categories()
-    for category in categories:
-        if category.name == name:
-            return category
-    return None
+    category = _category_index().get(name)
+    # Hand out a copy so callers can edit it without touching the cache
+    return copy.copy(category) if category is not None else None
 
 def add_category(category: Category) -> bool:
     """Add a new category"""
     try:
-        categories = read_categories()
         # Check if category already exists
-        for existing_category in categories:
-            if existing_category.name == category.name:
-                return False
-        categories.append(category)
-        write_categories(categories)
+        if category.name in _category_index():
+            return False
+        if not _csv_appendable(CATEGORIES_FILE, CATEGORY_FIELDS):
+            # Missing file or a layout we can't safely append to: rewrite it whole
+            categories = read_categories()
+            categories.append(category)
+            write_categories(categories)
+            return True
+        _append_csv_rows(CATEGORIES_FILE, [category.to_row()], [category])
         return True
     except Exception:
         return False
@@ -606,21 +1139,23 @@ def add_category(category: Category) -> bool:
 def update_category(old_name: str, updated_category: Category) -> bool:
     """Update an existing category"""
     try:
+        index = _category_positions().get(old_name)
+        if index is None:
+            return False
         categories = read_categories()
-        for i, category in enumerate(categories):
-            if category.name == old_name:
-                categories[i] = updated_category
-                write_categories(categories)
-                return True
-        return False
+        categories[index] = updated_category
+        write_categories(categories)
+        return True
     except Exception:
         return False
 
 def delete_category(name: str) -> bool:
     """Delete a category"""
     try:
-        categories = read_categories()
-        categories = [cat for cat in categories if cat.name != name]
+        # Nothing to rewrite when no category has this name
+        if name not in _category_positions():
+            return True
+        categories = [cat for cat in _cached_categories() if cat.name != name]
         write_categories(categories)
         return True
     except Exception:
@@ -628,85 +1163,146 @@ def delete_category(name: str) -> bool:
 
 def get_category_names() -> List[str]:
     """Get list of all category names"""
-    categories = read_categories()
-    return [category.name for category in categories]
+    return [category.name for category in _cached_categories()]
 
 def is_category_in_use(category_name: str) -> bool:
     """Check if a category is being used by any inventory items"""
-    items = read_inventory()
-    for item in items:
-        if item.category == category_name:
-            return True
-    return False
+    return category_name in compute_vendor_and_category_usage()[1]
 
 # Waste Log Archival Functions
 
-def initialize_waste_archive():
+def initialize_waste_archive(existing: Optional[set] = None):
     """Initialize waste archive directory and weekly reports file"""
-    if not os.path.exists(WASTE_ARCHIVE_DIR):
-        os.makedirs(WASTE_ARCHIVE_DIR)
+    # existing: names already in the working directory, when the caller has listed it
+    if existing is None:
+        existing = {name for name in (WASTE_ARCHIVE_DIR, WEEKLY_REPORTS_FILE) if os.path.exists(name)}
+    if WASTE_ARCHIVE_DIR not in existing:
+        os.makedirs(WASTE_ARCHIVE_DIR, exist_ok=True)
     
-    if not os.path.exists(WEEKLY_REPORTS_FILE):
+    if WEEKLY_REPORTS_FILE not in existing:
         with open(WEEKLY_REPORTS_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['week_start', 'week_end', 'total_entries', 'total_value', 'by_category', 'by_reason', 'by_item'])
             writer.writeheader()
 
+def _oldest_waste_date(entries: List[WasteEntry]) -> Optional[datetime]:
+    """Earliest entry date in the waste log, or None if any date can't be parsed"""
+    dates = [entry.date for entry in entries]
+    try:
+        is_padded = _PADDED_DATETIME_RE.fullmatch
+        if all(isinstance(date, str) and is_padded(date) for date in dates):
+            # Every date is still parsed, so an impossible one like 2025-02-30 is caught, but
+            # padded timestamps can take the fromisoformat fast path instead of strptime
+            return min(map(datetime.fromisoformat, dates), default=None)
+        return min(datetime.strptime(date, DATETIME_FORMAT) for date in dates)
+    except (ValueError, TypeError):
+        return None
+
+def _carry_oldest_waste_date(entries: List[WasteEntry]):
+    """Derived-value carrier for an append: the new oldest date is the older of the two"""
+    def carry(derived):
+        if 'oldest_date' not in derived:
+            return None
+        oldest = derived['oldest_date']
+        added_oldest = _oldest_waste_date(entries)
+        if oldest is None or added_oldest is None:
+            return {'oldest_date': None}
+        return {'oldest_date': min(oldest, added_oldest)}
+    return carry
+
 def should_archive_waste_log() -> bool:
     """Check if waste log should be archived (7 days old)"""
-    if not os.path.exists(WASTE_LOG_FILE):
-        return False
-    
     # Check if file has any entries
-    entries = read_waste_log()
+    entries = _cached_waste_log()
     if not entries:
         return False
     
-    try:
-        # Check if oldest entry is 7+ days old
-        oldest_entry_date = min(datetime.strptime(entry.date, '%Y-%m-%d %H:%M:%S') for entry in entries)
-        return (datetime.now() - oldest_entry_date).days >= 7
-    except (ValueError, TypeError):
+    # Check if oldest entry is 7+ days old; the date is parsed once per version of the log
+    oldest_entry_date = _cached_lookup(WASTE_LOG_FILE, _cached_waste_log, 'oldest_date', _oldest_waste_date)
+    if oldest_entry_date is None:
         # If there's an issue parsing dates, don't archive
         return False
+    return (datetime.now() - oldest_entry_date).days >= 7
 
 def generate_weekly_report(entries: List[WasteEntry], week_start: str, week_end: str) -> WeeklyWasteReport:
     """Generate weekly waste report from entries"""
     total_entries = len(entries)
-    total_value = sum(entry.waste_value() for entry in entries)
-    
-    # Group by category (get category from inventory)
-    by_category = {}
-    inventory_items = {item.name: item for item in read_inventory()}
-    
+    item_categories = get_item_categories()
+    
+    # Total and group by category (from inventory), reason and item in one pass
+    total_value = 0
+    by_category = defaultdict(float)
+    by_reason = defaultdict(float)
+    by_item = defaultdict(float)
+    category_of = item_categories.get
     for entry in entries:
-        item = inventory_items.get(entry.item_name)
-        category = item.category if item else 'Unknown'
-        by_category[category] = by_category.get(category, 0) + entry.waste_value()
-    
-    # Group by reason
-    by_reason = {}
-    for entry in entries:
-        by_reason[entry.reason] = by_reason.get(entry.reason, 0) + entry.waste_value()
-    
-    # Group by item
-    by_item = {}
-    for entry in entries:
-        by_item[entry.item_name] = by_item.get(entry.item_name, 0) + entry.waste_value()
+        value = entry.waste_value()
+        total_value += value
+        category = category_of(entry.item_name, 'Unknown')
+        by_category[category] += value
+        by_reason[entry.reason] += value
+        by_item[entry.item_name] += value
     
     return WeeklyWasteReport(
         week_start=week_start,
         week_end=week_end,
         total_entries=total_entries,
         total_value=total_value,
-        by_category=by_category,
-        by_reason=by_reason,
-        by_item=by_item
+        by_category=dict(by_category),
+        by_reason=dict(by_reason),
+        by_item=dict(by_item)
     )
 
+def summarize_non_hpm_waste() -> Optional[dict]:
+    """Totals and category/reason breakdown of the logged waste for non-HPM items"""
+    inventory = _cached_inventory()
+    entries = _cached_waste_log()
+    # (inventory it was built from, summary), kept with the parsed waste log and
+    # replaced as one tuple so a reader never pairs a new inventory with an old summary
+    cached = _csv_cache.get(WASTE_LOG_FILE)
+    derived = cached[2] if cached is not None and cached[1] is entries else {}
+    memo = derived.get('non_hpm_summary')
+    if memo is not None and memo[0] is inventory:
+        return memo[1]
+    item_categories = get_item_categories()
+    hpm_names = get_hpm_item_names()
+    category_of = item_categories.get
+    summary = None
+    total_value = 0
+    total_entries = 0
+    by_category = defaultdict(float)
+    by_reason = defaultdict(float)
+    for entry in entries:
+        name = entry.item_name
+        # Only entries for items in the inventory and not supplied by HPM count
+        if name not in item_categories or name in hpm_names:
+            continue
+        value = entry.waste_value()
+        total_value += value
+        total_entries += 1
+        category = category_of(name, 'Unknown')
+        by_category[category] += value
+        by_reason[entry.reason] += value
+    if total_entries:
+        summary = {
+            'total_value': total_value,
+            'total_entries': total_entries,
+            'by_category': dict(by_category),
+            'by_reason': dict(by_reason)
+        }
+    derived['non_hpm_summary'] = (inventory, summary)
+    return summary
+
+# Held by whoever is archiving the waste log, so two archivers never race on the same file
+_archive_lock = threading.RLock()
+
 def archive_waste_log():
     """Archive current waste log and generate weekly report"""
-    entries = read_waste_log()
-    if not entries:
+    with _archive_lock:
+        _archive_waste_log()
+
+def _archive_waste_log():
+    """archive_waste_log body; the caller holds _archive_lock"""
+    if not read_waste_log():
         return
     
     # Initialize archive if needed
@@ -717,61 +1313,106 @@ def archive_waste_log():
     week_start = now - timedelta(days=7)
     week_end = now
     
-    # Generate weekly report
-    report = generate_weekly_report(entries, week_start.strftime('%Y-%m-%d'), week_end.strftime('%Y-%m-%d'))
-    
-    # Save weekly report
-    save_weekly_report(report)
-    
     # Archive waste log file
     archive_filename = f"waste_log_{week_start.strftime('%Y%m%d')}_{week_end.strftime('%Y%m%d')}.csv"
     archive_path = os.path.join(WASTE_ARCHIVE_DIR, archive_filename)
-    shutil.copy2(WASTE_LOG_FILE, archive_path)
-    
-    # Clear current waste log
-    with open(WASTE_LOG_FILE, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost'])
-        writer.writeheader()
+    # Appends take the cache lock too, so none lands between moving the log and starting a fresh one
+    with _csv_cache_lock:
+        try:
+            # Move the log rather than copying it; a rename doesn't touch the data
+            os.replace(WASTE_LOG_FILE, archive_path)
+        except PermissionError:
+            # Windows won't rename a file another process has open: copy it, then truncate it below
+            shutil.copyfile(WASTE_LOG_FILE, archive_path)
+            mode = 'w'
+        else:
+            # Exclusive create, unless an entry logged meanwhile already recreated the log
+            mode = 'x'
+        try:
+            with open(WASTE_LOG_FILE, mode, newline='') as file:
+                csv.writer(file).writerow(WASTE_LOG_FIELDS)
+        except FileExistsError:
+            pass
+        _invalidate_csv_cache(WASTE_LOG_FILE)
+    
+    # Report on the archived file itself, so entries logged after the check above are counted
+    entries = _parse_csv_file(archive_path, _parse_waste_rows)
+    report = generate_weekly_report(entries, week_start.strftime('%Y-%m-%d'), week_end.strftime('%Y-%m-%d'))
+    save_weekly_report(report)
+
+def _append_report(path: str, report, parse_rows):
+    """Append a report row, extending the cached parse of the reports file when that is current"""
+    values = report.to_dict()
+    fields = list(values)
+    row = tuple(values.values())
+    if not _csv_appendable(path, fields):
+        with open(path, 'a', newline='') as file:
+            csv.writer(file).writerow(row)
+        return
+    # Parsed back from the text being written, so the cache matches a fresh read exactly
+    parsed = parse_rows(iter([fields, ['' if value is None else str(value) for value in row]]))
+    _append_csv_rows(path, [row], parsed)
 
 def save_weekly_report(report: WeeklyWasteReport):
     """Save weekly report to file"""
-    with open(WEEKLY_REPORTS_FILE, 'a', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['week_start', 'week_end', 'total_entries', 'total_value', 'by_category', 'by_reason', 'by_item'])
-        writer.writerow(report.to_dict())
+    _append_report(WEEKLY_REPORTS_FILE, report, _parse_weekly_report_rows)
 
-def read_weekly_reports() -> List[WeeklyWasteReport]:
-    """Read weekly waste reports from file"""
+def _load_report_dict(text: str) -> dict:
+    """Parse a dict column of a report file, written as JSON or by older versions as a Python literal"""
+    if not text:
+        return {}
+    try:
+        return json.loads(text)
+    except ValueError:
+        # Never eval: the file is plain data and must not be able to run code
+        return ast.literal_eval(text)
+
+def _parse_weekly_report_rows(reader) -> List[WeeklyWasteReport]:
+    """Build weekly waste reports from csv.reader rows, stopping at the first bad row"""
     reports = []
-    if not os.path.exists(WEEKLY_REPORTS_FILE):
+    columns = _header_columns(reader)
+    if columns is None:
         return reports
     
     try:
-        with open(WEEKLY_REPORTS_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
+        week_start_i, week_end_i = columns['week_start'], columns['week_end']
+        total_entries_i, total_value_i = columns['total_entries'], columns['total_value']
+        by_category_i, by_reason_i, by_item_i = columns['by_category'], columns['by_reason'], columns['by_item']
+        for row in reader:
+            if not row:
+                continue
+            report = WeeklyWasteReport(
+                week_start=row[week_start_i],
+                week_end=row[week_end_i],
+                total_entries=int(row[total_entries_i]),
+                total_value=float(row[total_value_i]),
                 # Parse dictionary strings back to dicts
-                by_category = eval(row['by_category']) if row['by_category'] else {}
-                by_reason = eval(row['by_reason']) if row['by_reason'] else {}
-                by_item = eval(row['by_item']) if row['by_item'] else {}
-                
-                report = WeeklyWasteReport(
-                    week_start=row['week_start'],
-                    week_end=row['week_end'],
-                    total_entries=int(row['total_entries']),
-                    total_value=float(row['total_value']),
-                    by_category=by_category,
-                    by_reason=by_reason,
-                    by_item=by_item
-                )
-                reports.append(report)
+                by_category=_load_report_dict(row[by_category_i]),
+                by_reason=_load_report_dict(row[by_reason_i]),
+                by_item=_load_report_dict(row[by_item_i])
+            )
+            reports.append(report)
     except Exception:
         pass
     
     return reports
 
-def get_week_comparison(weeks_back: int = 1) -> Tuple[Optional[WeeklyWasteReport], Optional[WeeklyWasteReport]]:
+def _cached_weekly_reports() -> List[WeeklyWasteReport]:
+    """Shared parsed weekly waste reports; callers must not mutate the list or its items"""
+    try:
+        return _load_csv_cached(WEEKLY_REPORTS_FILE, _parse_weekly_report_rows)
+    except (OSError, csv.Error, UnicodeDecodeError):
+        return []
+
+def read_weekly_reports() -> List[WeeklyWasteReport]:
+    """Read weekly waste reports from file"""
+    return list(_cached_weekly_reports())
+
+def get_week_comparison(weeks_back: int = 1, reports: Optional[List[WeeklyWasteReport]] = None) -> Tuple[Optional[WeeklyWasteReport], Optional[WeeklyWasteReport]]:
     """Get comparison between current week and previous week(s)"""
-    reports = read_weekly_reports()
+    # Reuse reports the caller already loaded, else index the shared parse without copying it
+    if reports is None:
+        reports = _cached_weekly_reports()
     if len(reports) < weeks_back + 1:
         return None, None
     
@@ -782,118 +1423,143 @@ def get_week_comparison(weeks_back: int = 1) -> Tuple[Optional[WeeklyWasteReport
 
 def check_and_archive_if_needed():
     """Check if archival is needed and perform it"""
+    # Another thread is already archiving; nothing for this caller to do
+    if not _archive_lock.acquire(blocking=False):
+        return False
     try:
         if should_archive_waste_log():
-            archive_waste_log()
+            _archive_waste_log()
             return True
         return False
     except Exception:
         # If archival fails, don't break the application
         return False
+    finally:
+        _archive_lock.release()
 
 # Weekly Inventory Tracking Functions
-def initialize_weekly_inventory_reports():
+def initialize_weekly_inventory_reports(existing: Optional[set] = None):
     """Initialize weekly inventory reports file"""
-    if not os.path.exists(WEEKLY_INVENTORY_REPORTS_FILE):
+    if existing is None:
+        existing = {WEEKLY_INVENTORY_REPORTS_FILE} if os.path.exists(WEEKLY_INVENTORY_REPORTS_FILE) else set()
+    if WEEKLY_INVENTORY_REPORTS_FILE not in existing:
         with open(WEEKLY_INVENTORY_REPORTS_FILE, 'w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['week_start', 'week_end', 'total_items', 'total_value', 'by_category', 'by_vendor', 'low_stock_items', 'generated_date'])
             writer.writeheader()
 
+def _cached_weekly_inventory_reports() -> List[WeeklyInventoryReport]:
+    """Shared parsed weekly inventory reports; callers must not mutate the list or its items"""
+    try:
+        return _load_csv_cached(WEEKLY_INVENTORY_REPORTS_FILE, _parse_weekly_inventory_report_rows)
+    except (OSError, csv.Error, UnicodeDecodeError):
+        return []
+
+def _last_inventory_report_end(reports: List[WeeklyInventoryReport]) -> Optional[datetime]:
+    """End date of the newest weekly inventory report, or None when there is none"""
+    if not reports:
+        return None
+    return datetime.strptime(reports[-1].week_end, '%Y-%m-%d')
+
 def should_generate_weekly_inventory_report() -> bool:
     """Check if it's time to generate a weekly inventory report (every 7 days)"""
-    reports = read_weekly_inventory_reports()
-    if not reports:
+    # The last end date only changes when the reports file does, so it is parsed once per version
+    last_date = _cached_lookup(WEEKLY_INVENTORY_REPORTS_FILE, _cached_weekly_inventory_reports,
+                               'last_end', _last_inventory_report_end)
+    if last_date is None:
         return True
     
-    last_report = reports[-1]
-    last_date = datetime.strptime(last_report.week_end, '%Y-%m-%d')
     current_date = datetime.now()
     
     return (current_date - last_date).days >= 7
 
+def _weekly_inventory_totals(non_hpm_items: Tuple[InventoryItem, ...]) -> Tuple[int, float, dict, dict]:
+    """Item count, stock value and value by category and by vendor of the given non-HPM items"""
+    # Total, group by category and group by vendor in one pass, valuing each item once
+    total_value = 0
+    by_category = defaultdict(float)
+    by_vendor = defaultdict(float)
+    for item in non_hpm_items:
+        value = item.total_value()
+        total_value += value
+        category = item.category
+        by_category[category] += value
+        vendors = item.get_vendors() or ['No Vendor']
+        # Split value across vendors, dividing once per item
+        share = value / len(vendors)
+        for vendor in vendors:
+            by_vendor[vendor] += share
+    return len(non_hpm_items), total_value, dict(by_category), dict(by_vendor)
+
 def generate_weekly_inventory_report() -> WeeklyInventoryReport:
     """Generate weekly inventory report from current inventory (excluding HPM items)"""
     current_date = datetime.now()
-    week_start = (current_date - timedelta(days=current_date.weekday())).strftime('%Y-%m-%d')
-    week_end = (current_date + timedelta(days=6-current_date.weekday())).strftime('%Y-%m-%d')
-    
-    # Get all inventory items excluding HPM items
-    all_items = read_inventory()
-    non_hpm_items = [item for item in all_items if 'HPM' not in item.get_vendors()]
+    weekday = current_date.weekday()
+    week_start = (current_date - timedelta(days=weekday)).strftime('%Y-%m-%d')
+    week_end = (current_date + timedelta(days=6-weekday)).strftime('%Y-%m-%d')
     
-    # Calculate totals
-    total_items = len(non_hpm_items)
-    total_value = sum(item.total_value() for item in non_hpm_items)
-    low_stock_items = len([item for item in non_hpm_items if item.is_low_stock()])
-    
-    # Group by category
-    by_category = {}
-    for item in non_hpm_items:
-        category = item.category
-        if category not in by_category:
-            by_category[category] = 0
-        by_category[category] += item.total_value()
-    
-    # Group by vendor
-    by_vendor = {}
-    for item in non_hpm_items:
-        vendors = item.get_vendors() if item.get_vendors() else ['No Vendor']
-        for vendor in vendors:
-            if vendor not in by_vendor:
-                by_vendor[vendor] = 0
-            by_vendor[vendor] += item.total_value() / len(vendors)  # Split value across vendors
+    # Totals depend only on the inventory, so they are computed once per version of it
+    total_items, total_value, by_category, by_vendor = _cached_lookup(
+        INVENTORY_FILE, _cached_inventory, 'weekly_inventory_totals',
+        lambda items: _weekly_inventory_totals(_inventory_partition()[1]))
+    low_stock_items = len(_inventory_low_stock()[2])
     
     return WeeklyInventoryReport(
         week_start=week_start,
         week_end=week_end,
         total_items=total_items,
         total_value=total_value,
-        by_category=by_category,
-        by_vendor=by_vendor,
+        by_category=dict(by_category),
+        by_vendor=dict(by_vendor),
         low_stock_items=low_stock_items,
-        generated_date=current_date.strftime('%Y-%m-%d %H:%M:%S')
+        generated_date=format_timestamp(current_date)
     )
 
 def save_weekly_inventory_report(report: WeeklyInventoryReport):
     """Save weekly inventory report to file"""
     initialize_weekly_inventory_reports()
-    with open(WEEKLY_INVENTORY_REPORTS_FILE, 'a', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['week_start', 'week_end', 'total_items', 'total_value', 'by_category', 'by_vendor', 'low_stock_items', 'generated_date'])
-        writer.writerow(report.to_dict())
+    _append_report(WEEKLY_INVENTORY_REPORTS_FILE, report, _parse_weekly_inventory_report_rows)
 
-def read_weekly_inventory_reports() -> List[WeeklyInventoryReport]:
-    """Read weekly inventory reports from file"""
+def _parse_weekly_inventory_report_rows(reader) -> List[WeeklyInventoryReport]:
+    """Build weekly inventory reports from csv.reader rows, stopping at the first bad row"""
     reports = []
-    if not os.path.exists(WEEKLY_INVENTORY_REPORTS_FILE):
+    columns = _header_columns(reader)
+    if columns is None:
         return reports
     
     try:
-        with open(WEEKLY_INVENTORY_REPORTS_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
+        week_start_i, week_end_i = columns['week_start'], columns['week_end']
+        total_items_i, total_value_i = columns['total_items'], columns['total_value']
+        by_category_i, by_vendor_i = columns['by_category'], columns['by_vendor']
+        low_stock_items_i, generated_date_i = columns['low_stock_items'], columns['generated_date']
+        for row in reader:
+            if not row:
+                continue
+            report = WeeklyInventoryReport(
+                week_start=row[week_start_i],
+                week_end=row[week_end_i],
+                total_items=int(row[total_items_i]),
+                total_value=float(row[total_value_i]),
                 # Parse dictionary strings back to dicts
-                by_category = eval(row['by_category']) if row['by_category'] else {}
-                by_vendor = eval(row['by_vendor']) if row['by_vendor'] else {}
-                
-                report = WeeklyInventoryReport(
-                    week_start=row['week_start'],
-                    week_end=row['week_end'],
-                    total_items=int(row['total_items']),
-                    total_value=float(row['total_value']),
-                    by_category=by_category,
-                    by_vendor=by_vendor,
-                    low_stock_items=int(row['low_stock_items']),
-                    generated_date=row['generated_date']
-                )
-                reports.append(report)
+                by_category=_load_report_dict(row[by_category_i]),
+                by_vendor=_load_report_dict(row[by_vendor_i]),
+                low_stock_items=int(row[low_stock_items_i]),
+                generated_date=row[generated_date_i]
+            )
+            reports.append(report)
     except Exception:
         pass
     
     return reports
 
-def get_inventory_week_comparison(weeks_back: int = 1) -> Tuple[Optional[WeeklyInventoryReport], Optional[WeeklyInventoryReport]]:
+def read_weekly_inventory_reports() -> List[WeeklyInventoryReport]:
+    """Read weekly inventory reports from file"""
+    return list(_cached_weekly_inventory_reports())
+
+def get_inventory_week_comparison(weeks_back: int = 1, reports: Optional[List[WeeklyInventoryReport]] = None) -> Tuple[Optional[WeeklyInventoryReport], Optional[WeeklyInventoryReport]]:
     """Get comparison between current week and previous week(s) inventory reports"""
-    reports = read_weekly_inventory_reports()
+    # Reuse reports the caller already loaded, else index the shared parse without copying it
+    if reports is None:
+        reports = _cached_weekly_inventory_reports()
     if len(reports) < weeks_back + 1:
         return None, None
     
@@ -932,87 +1598,70 @@ def initialize_hpm_waste_archive():
 
 def generate_hpm_weekly_report():
     """Generate a manual HPM weekly report"""
-    from models import HPMWeeklyReport
-    import json
-    import glob
-    
     current_date = datetime.now()
-    all_items = read_inventory()
     
-    # Get HPM items only
-    hpm_items = [item for item in all_items if 'HPM' in item.get_vendors()]
+    # Get HPM items only, straight from the cached partition (read-only here)
+    hpm_items, _, hpm_item_names = _inventory_partition()
     
     # Get HPM waste entries from both current waste log and archives
-    all_waste_entries = read_waste_log()
-    hpm_waste_entries = [entry for entry in all_waste_entries if any(item.name == entry.item_name for item in hpm_items)]
+    hpm_waste_entries = [entry for entry in _cached_waste_log() if entry.item_name in hpm_item_names]
     
-    # Also check archived HPM waste entries
+    # Also check archived HPM waste entries; archives pile up week after week, so they
+    # are parsed on demand rather than kept in the shared parse cache
     if os.path.exists(HPM_WASTE_ARCHIVE_DIR):
         for archive_file in glob.glob(os.path.join(HPM_WASTE_ARCHIVE_DIR, '*.csv')):
             try:
-                with open(archive_file, 'r', newline='') as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        if any(item.name == row['item_name'] for item in hpm_items):
-                            from models import WasteEntry
-                            archived_entry = WasteEntry(
-                                item_name=row['item_name'],
-                                quantity=float(row['quantity']),
-                                unit=row['unit'],
-                                reason=row['reason'],
-                                date=row['date'],
-                                logged_by=row['logged_by'],
-                                unit_cost=float(row.get('unit_cost', 0))
-                            )
-                            hpm_waste_entries.append(archived_entry)
+                archived_entries = _parse_csv_file(archive_file, _parse_waste_rows)
             except Exception:
                 continue  # Skip corrupted archive files
+            hpm_waste_entries.extend(entry for entry in archived_entries
+                                     if entry.item_name in hpm_item_names)
     
     # Calculate stats
     total_items = len(hpm_items)
-    total_value = sum(item.total_value() for item in hpm_items)
-    low_stock_count = len([item for item in hpm_items if item.is_low_stock()])
-    total_waste_value = sum(entry.waste_value() for entry in hpm_waste_entries)
+    total_value = sum_stock_value(hpm_items)
+    low_stock_count = len(_inventory_low_stock()[1])
     
-    # Get top waste categories
-    waste_by_category = {}
-    inventory_dict = {item.name: item for item in hpm_items}
-    for entry in hpm_waste_entries:
-        item = inventory_dict.get(entry.item_name)
-        if item:
-            category = item.category
-            waste_by_category[category] = waste_by_category.get(category, 0) + entry.waste_value()
-    
-    # Format top categories
-    sorted_categories = sorted(waste_by_category.items(), key=lambda x: x[1], reverse=True)
-    top_categories = ', '.join([f"{cat}: ${val:.2f}" for cat, val in sorted_categories[:3]])
-    
-    # Create detailed waste information
+    # Waste value, category totals and detail rows for each entry in one pass
+    waste_values = []
+    waste_by_category = defaultdict(float)
     waste_details = []
+    inventory_dict = _cached_lookup(INVENTORY_FILE, _cached_inventory, 'hpm_by_name',
+                                    lambda items: {item.name: item for item in _inventory_partition()[0]})
     for entry in hpm_waste_entries:
+        value = entry.waste_value()
+        waste_values.append(value)
         item = inventory_dict.get(entry.item_name)
         if item:
+            category = item.category
+            waste_by_category[category] += value
             waste_details.append({
                 'item_name': entry.item_name,
                 'quantity': str(entry.quantity),
                 'unit': item.unit,
                 'cost_per_unit': str(item.unit_cost),
-                'waste_value': str(entry.waste_value()),
+                'waste_value': str(value),
                 'reason': entry.reason,
                 'date': entry.date,
                 'user': entry.logged_by,
                 'category': item.category
             })
+    total_waste_value = sum(waste_values)
+    
+    # Format top categories
+    # Only the top three are shown, so select them rather than sorting every category
+    sorted_categories = heapq.nlargest(3, waste_by_category.items(), key=operator.itemgetter(1))
+    top_categories = ', '.join(f"{cat}: ${val:.2f}" for cat, val in sorted_categories)
     
     # Sort waste details by value (highest first)
     waste_details.sort(key=lambda x: float(x['waste_value']), reverse=True)
-    waste_details_json = json.dumps(waste_details)
+    waste_details_json = json.dumps(waste_details, separators=(',', ':'))
     
     # Generate comparison notes with previous report
     comparison_notes = generate_hpm_comparison_notes(total_items, total_value, low_stock_count, total_waste_value)
     
     return HPMWeeklyReport(
-        date=current_date.strftime('%Y-%m-%d %H:%M:%S'),
+        date=format_timestamp(current_date),
         total_items=total_items,
         total_value=total_value,
         low_stock_count=low_stock_count,
@@ -1025,46 +1674,94 @@ def generate_hpm_weekly_report():
 def save_hpm_report(report):
     """Save HPM report to file"""
     initialize_hpm_reports()
-    with open(HPM_REPORTS_FILE, 'a', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['date', 'total_items', 'total_value', 'low_stock_count', 'total_waste_value', 'top_waste_categories', 'waste_details', 'comparison_notes'])
-        writer.writerow(report.to_dict())
+    _append_report(HPM_REPORTS_FILE, report, _parse_hpm_report_rows)
 
-def read_hpm_reports():
-    """Read HPM reports from file"""
-    from models import HPMWeeklyReport
-    
+def _parse_hpm_report_rows(reader) -> List[HPMWeeklyReport]:
+    """Build HPM reports from csv.reader rows, stopping at the first bad row"""
     reports = []
-    if not os.path.exists(HPM_REPORTS_FILE):
+    columns = _header_columns(reader)
+    if columns is None:
         return reports
     
     try:
-        with open(HPM_REPORTS_FILE, 'r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                report = HPMWeeklyReport(
-                    date=row['date'],
-                    total_items=int(row['total_items']),
-                    total_value=float(row['total_value']),
-                    low_stock_count=int(row['low_stock_count']),
-                    total_waste_value=float(row['total_waste_value']),
-                    top_waste_categories=row['top_waste_categories'],
-                    waste_details=row.get('waste_details', '[]'),
-                    comparison_notes=row['comparison_notes']
-                )
-                reports.append(report)
+        date_i, total_items_i, total_value_i = columns['date'], columns['total_items'], columns['total_value']
+        low_stock_count_i, total_waste_value_i = columns['low_stock_count'], columns['total_waste_value']
+        top_waste_categories_i, comparison_notes_i = columns['top_waste_categories'], columns['comparison_notes']
+        waste_details_i = columns.get('waste_details')
+        for row in reader:
+            if not row:
+                continue
+            report = HPMWeeklyReport(
+                date=row[date_i],
+                total_items=int(row[total_items_i]),
+                total_value=float(row[total_value_i]),
+                low_stock_count=int(row[low_stock_count_i]),
+                total_waste_value=float(row[total_waste_value_i]),
+                top_waste_categories=row[top_waste_categories_i],
+                waste_details=row[waste_details_i] if waste_details_i is not None else '[]',
+                comparison_notes=row[comparison_notes_i]
+            )
+            reports.append(report)
     except Exception:
         pass
     
     return reports
 
+def read_hpm_reports():
+    """Read HPM reports from file"""
+    try:
+        reports = _load_csv_cached(HPM_REPORTS_FILE, _parse_hpm_report_rows)
+    except (OSError, csv.Error, UnicodeDecodeError):
+        return []
+    # Copies, since the reports page annotates the reports it is given
+    return [copy.copy(report) for report in reports]
+
+# Bytes read per step when scanning back from the end of the HPM reports file
+TAIL_READ_SIZE = 1 << 12
+
+def _read_last_hpm_report() -> Optional[HPMWeeklyReport]:
+    """Last report in the HPM reports file, read from its header and final line only"""
+    cached = _csv_cache.get(HPM_REPORTS_FILE)
+    try:
+        st = os.stat(HPM_REPORTS_FILE)
+        if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+            return cached[1][-1] if cached[1] else None
+        with open(HPM_REPORTS_FILE, 'rb') as file:
+            header = file.readline()
+            start = file.tell()
+            pos = file.seek(0, os.SEEK_END)
+            tail = b''
+            # Step back until the tail holds a line break before the last non-empty line
+            while pos > start:
+                step = min(TAIL_READ_SIZE, pos - start)
+                pos -= step
+                file.seek(pos)
+                tail = file.read(step) + tail
+                if b'\n' in tail.rstrip(b'\r\n'):
+                    break
+    except OSError:
+        return None
+    last_line = tail.rstrip(b'\r\n').rsplit(b'\n', 1)[-1]
+    if not last_line:
+        return None
+    # Decoded the way open() would decode the whole file
+    text = io.TextIOWrapper(io.BytesIO(header + last_line + b'\n'), newline='')
+    try:
+        reports = _parse_hpm_report_rows(csv.reader(text))
+    except (csv.Error, UnicodeDecodeError):
+        reports = []
+    if reports:
+        return reports[0]
+    # The last line didn't parse on its own (e.g. a field with a line break): read it all
+    reports = read_hpm_reports()
+    return reports[-1] if reports else None
+
 def generate_hpm_comparison_notes(current_items, current_value, current_low_stock, current_waste):
     """Generate comparison notes with previous HPM report"""
-    previous_reports = read_hpm_reports()
-    if not previous_reports:
+    last_report = _read_last_hpm_report()
+    if last_report is None:
         return "First HPM report generated"
     
-    last_report = previous_reports[-1]
-    
     notes = []
     
     # Items comparison
@@ -1101,41 +1798,44 @@ def generate_hpm_comparison_notes(current_items, current_value, current_low_stoc
 
 def archive_hpm_waste_log():
     """Archive HPM waste log entries and remove them from main log"""
+    # Held from the read to the rewrite, so an entry appended in between isn't dropped
+    with _csv_cache_lock:
+        return _archive_hpm_waste_log()
+
+def _archive_hpm_waste_log():
+    """archive_hpm_waste_log body; the caller holds _csv_cache_lock"""
     initialize_hpm_waste_archive()
     
-    # Read all waste entries
-    all_waste_entries = read_waste_log()
-    all_items = read_inventory()
+    # Read all waste entries from the parse cache (read-only here)
+    all_waste_entries = _cached_waste_log()
     
     # Get HPM items
-    hpm_items = [item for item in all_items if 'HPM' in item.get_vendors()]
-    hpm_item_names = set(item.name for item in hpm_items)
+    hpm_item_names = get_hpm_item_names()
     
-    # Separate HPM and non-HPM waste entries
-    hpm_waste_entries = [entry for entry in all_waste_entries if entry.item_name in hpm_item_names]
-    non_hpm_waste_entries = [entry for entry in all_waste_entries if entry.item_name not in hpm_item_names]
+    # Separate HPM and non-HPM waste entries in one pass
+    hpm_waste_entries = []
+    non_hpm_waste_entries = []
+    for entry in all_waste_entries:
+        (hpm_waste_entries if entry.item_name in hpm_item_names else non_hpm_waste_entries).append(entry)
     
     if not hpm_waste_entries:
         return 0  # No HPM waste entries to archive
     
     # Create archive file with timestamp
     current_date = datetime.now()
-    archive_filename = f"hpm_waste_log_{current_date.strftime('%Y%m%d_%H%M%S')}.csv"
+    d = current_date
+    archive_filename = f"hpm_waste_log_{d.year:04d}{d.month:02d}{d.day:02d}_{d.hour:02d}{d.minute:02d}{d.second:02d}.csv"
     archive_path = os.path.join(HPM_WASTE_ARCHIVE_DIR, archive_filename)
     
-    # Write HPM waste entries to archive
-    with open(archive_path, 'w', newline='') as file:
-        if hpm_waste_entries:
-            writer = csv.DictWriter(file, fieldnames=['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost'])
-            writer.writeheader()
-            for entry in hpm_waste_entries:
-                writer.writerow(entry.to_dict())
+    # Write HPM waste entries to archive; all or nothing, so a crash can't leave a partial archive to be counted later
+    with _atomic_write(archive_path) as file:
+        writer = csv.writer(file)
+        writer.writerow(WASTE_LOG_FIELDS)
+        writer.writerows(entry.to_row() for entry in hpm_waste_entries)
     
-    # Rewrite main waste log with only non-HPM entries
-    with open(WASTE_LOG_FILE, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['item_name', 'quantity', 'unit', 'reason', 'date', 'logged_by', 'unit_cost'])
-        writer.writeheader()
-        for entry in non_hpm_waste_entries:
-            writer.writerow(entry.to_dict())
+    # Rewrite main waste log with only non-HPM entries; they are the cached entries,
+    # untouched, so they can stand as the new cached parse
+    write_waste_log(non_hpm_waste_entries)
+    _store_csv_cache(WASTE_LOG_FILE, non_hpm_waste_entries)
     
     return len(hpm_waste_entries)